@@ -1,63 +1,236 @@
+import csv
+import importlib
 import json
+import os
+import pickle
+import sys
+import tempfile
+import time
 
-from typing import Any, Callable, Dict
-from functools import wraps
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, TextIO
+from xml.sax.saxutils import escape
 
 Data = Dict[str, Any]
 ExportFn = Callable[[Data], str]
+# Writes records one at a time to a file-like sink, so memory use does not
+# grow with the number of records.
+StreamExportFn = Callable[[Iterable[Data], TextIO], None]
+# Opens a new sink for a format; export_all closes it when the writer is done.
+SinkFactory = Callable[[str], TextIO]
 
 exporters: Dict[str, ExportFn] = {}
+stream_exporters: Dict[str, StreamExportFn] = {}
+# Lazy formats map to a "module:function" path; the first use imports it and
+# moves the function into the registry above.
+_lazy_exporters: Dict[str, str] = {}
+_lazy_stream_exporters: Dict[str, str] = {}
+# MIME type -> format name, shared by both registries.
+mime_types: Dict[str, str] = {}
 
 
-def register_exporter(format_name: str) -> Callable[[ExportFn], ExportFn]:
-    def decorator(func: ExportFn) -> ExportFn:
-        @wraps(func)
-        def wrapper(data: Data) -> str:
-            return func(data)
+def _import_target(target: str) -> Callable[..., Any]:
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _resolve(registry: Dict[str, Any], lazy: Dict[str, str], name: str, kind: str) -> Callable[..., Any]:
+    format_name = mime_types.get(name, name)
+    if format_name in registry:
+        return registry[format_name]
+    if format_name in lazy:
+        # Import before dropping the lazy entry, so a failed import can be retried.
+        export_fn = registry[format_name] = _import_target(lazy[format_name])
+        del lazy[format_name]
+        return export_fn
+    raise ValueError(f"{kind} for format '{name}' is not registered.")
 
-        exporters[format_name] = wrapper
-        return wrapper
+
+def register_exporter(format_name: str, mime_type: str | None = None) -> Callable[[ExportFn], ExportFn]:
+    def decorator(func: ExportFn) -> ExportFn:
+        exporters[format_name] = func
+        if mime_type:
+            mime_types[mime_type] = format_name
+        return func
 
     return decorator
 
 
-@register_exporter("json")
+def register_lazy_exporter(format_name: str, target: str, mime_type: str | None = None) -> None:
+    _lazy_exporters[format_name] = target
+    if mime_type:
+        mime_types[mime_type] = format_name
+
+
+def resolve_exporter(name: str) -> ExportFn:
+    """Return the exporter for a format name or MIME type."""
+    return _resolve(exporters, _lazy_exporters, name, "Exporter")
+
+
+def exporter_formats() -> list[str]:
+    return [*exporters, *_lazy_exporters]
+
+
+@register_exporter("json", "application/json")
 def export_to_json(data: Data) -> str:
     return json.dumps(data, indent=4)
 
 
-@register_exporter("xml")
+@register_exporter("xml", "application/xml")
 def export_to_xml(data: Data) -> str:
     xml_items = [f"<{key}>{value}</{key}>" for key, value in data.items()]
     return "<root>\n" + "\n".join(xml_items) + "\n</root>"
 
 
-@register_exporter("csv")
+@register_exporter("csv", "text/csv")
 def export_to_csv(data: Data) -> str:
     csv_items = [f"{key},{value}" for key, value in data.items()]
     return "\n".join(csv_items)
 
 
-@register_exporter("pdf")
-def export_to_pdf(data: Data) -> str:
-    pdf_content = "PDF Document\n\n"
-    for key, value in data.items():
-        pdf_content += f"{key}: {value}\n"
-    return pdf_content
+# PDF writing stands in for a heavy dependency, so it is only imported on use.
+register_lazy_exporter("pdf", "pdf_exporter:export_to_pdf", "application/pdf")
 
 
-@register_exporter("yaml")
-def export_to_yaml(data: Data) -> str:    
-    print("Exporting data to YAML format.")
+@register_exporter("yaml", "application/yaml")
+def export_to_yaml(data: Data) -> str:
     yaml_items = [f"{key}: {value}" for key, value in data.items()]
     return "\n".join(yaml_items)
 
 
 def export_data(data: Data, format_name: str) -> str:
-    if format_name not in exporters:
-        raise ValueError(f"Exporter for format '{format_name}' is not registered.")
-    export_fn = exporters[format_name]
-    return export_fn(data)
+    # Fast path: one dict lookup and a direct call to the registered function.
+    return (exporters.get(format_name) or resolve_exporter(format_name))(data)
+
+
+def register_stream_exporter(
+    format_name: str, mime_type: str | None = None
+) -> Callable[[StreamExportFn], StreamExportFn]:
+    def decorator(func: StreamExportFn) -> StreamExportFn:
+        stream_exporters[format_name] = func
+        if mime_type:
+            mime_types[mime_type] = format_name
+        return func
+
+    return decorator
+
+
+def register_lazy_stream_exporter(format_name: str, target: str, mime_type: str | None = None) -> None:
+    _lazy_stream_exporters[format_name] = target
+    if mime_type:
+        mime_types[mime_type] = format_name
+
+
+def resolve_stream_exporter(name: str) -> StreamExportFn:
+    """Return the stream exporter for a format name or MIME type."""
+    return _resolve(stream_exporters, _lazy_stream_exporters, name, "Stream exporter")
+
+
+def stream_exporter_formats() -> list[str]:
+    return [*stream_exporters, *_lazy_stream_exporters]
+
+
+@register_stream_exporter("json", "application/json")
+def stream_to_json(records: Iterable[Data], sink: TextIO) -> None:
+    sink.write("[")
+    for index, record in enumerate(records):
+        sink.write(",\n" if index else "\n")
+        sink.write(json.dumps(record))
+    sink.write("\n]\n")
+
+
+@register_stream_exporter("xml", "application/xml")
+def stream_to_xml(records: Iterable[Data], sink: TextIO) -> None:
+    sink.write("<root>\n")
+    for record in records:
+        items = "".join(f"<{key}>{escape(str(value))}</{key}>" for key, value in record.items())
+        sink.write(f"<record>{items}</record>\n")
+    sink.write("</root>\n")
+
+
+@register_stream_exporter("csv", "text/csv")
+def stream_to_csv(records: Iterable[Data], sink: TextIO) -> None:
+    iterator = iter(records)
+    first = next(iterator, None)
+    if first is None:
+        return
+    # The header comes from the first record; later records must use the same keys.
+    writer = csv.DictWriter(sink, fieldnames=list(first))
+    writer.writeheader()
+    writer.writerows(chain([first], iterator))
+
+
+register_lazy_stream_exporter("pdf", "pdf_exporter:stream_to_pdf", "application/pdf")
+
+
+@register_stream_exporter("yaml", "application/yaml")
+def stream_to_yaml(records: Iterable[Data], sink: TextIO) -> None:
+    for record in records:
+        lines = [f"{key}: {value}" for key, value in record.items()]
+        sink.write("- " + "\n  ".join(lines) + "\n")
+
+
+def export_stream(records: Iterable[Data], format_name: str, sink: TextIO) -> None:
+    (stream_exporters.get(format_name) or resolve_stream_exporter(format_name))(records, sink)
+
+
+def open_file_sink(directory: Path, format_name: str) -> TextIO:
+    """Open `export.<format>` in `directory`.
+
+    Bind the directory with functools.partial to get a sink factory that can
+    be pickled for a process pool, which a lambda cannot.
+    """
+    return open(directory / f"export.{format_name}", "w", newline="", encoding="utf-8")
+
+
+def _export_timed(records: tuple[Data, ...], format_name: str, sink_factory: SinkFactory) -> float:
+    # CPU time of this thread only: waiting for the GIL or for other writers
+    # does not count against the format.
+    start = time.thread_time()
+    with sink_factory(format_name) as sink:
+        export_stream(records, format_name, sink)
+    return time.thread_time() - start
+
+
+def _export_pickled(payload: bytes, format_name: str, sink_factory: SinkFactory) -> float:
+    return _export_timed(pickle.loads(payload), format_name, sink_factory)
+
+
+def export_all(
+    data: Data | Iterable[Data],
+    formats: Iterable[str],
+    sink_factory: SinkFactory,
+    executor: Executor | None = None,
+) -> Dict[str, float]:
+    """Export the same records to several formats concurrently.
+
+    The input is materialized once and pickled once for all writers. The
+    writers are CPU-bound, so by default they run in a ProcessPoolExecutor
+    with one process per format (up to the CPU count); `sink_factory` must
+    then be picklable, e.g. `partial(open_file_sink, directory)`. A
+    ThreadPoolExecutor also works and accepts any sink factory, but the
+    writers hold the GIL, so only their file I/O overlaps. Returns the CPU
+    seconds each format's writer used.
+    """
+    formats = list(formats)
+    for name in formats:
+        resolve_stream_exporter(name)  # fail on unknown formats before any writer starts
+
+    records: tuple[Data, ...] = (data,) if isinstance(data, dict) else tuple(data)
+    pool = executor or ProcessPoolExecutor(max_workers=min(len(formats), os.cpu_count() or 1) or 1)
+    try:
+        if isinstance(pool, ProcessPoolExecutor):
+            payload = pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+            futures = {name: pool.submit(_export_pickled, payload, name, sink_factory) for name in formats}
+        else:
+            futures = {name: pool.submit(_export_timed, records, name, sink_factory) for name in formats}
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        if executor is None:
+            pool.shutdown()
 
 
 def main() -> None:
@@ -67,11 +240,26 @@ def main() -> None:
         "city": "New York"
     }
 
-    for format_name in exporters.keys():
+    for format_name in exporter_formats():
         print(f"\n--- Exporting to {format_name.upper()} ---")
         exported_content = export_data(sample_data, format_name)
         print(exported_content)
 
+    for format_name in stream_exporter_formats():
+        print(f"\n--- Streaming records to {format_name.upper()} ---")
+        records = ({"id": i, "name": f"User {i}", "city": "New York"} for i in range(3))
+        export_stream(records, format_name, sys.stdout)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        records = [{"id": i, "name": f"User {i}", "city": "New York"} for i in range(100_000)]
+        start = time.perf_counter()
+        timings = export_all(records, stream_exporter_formats(), partial(open_file_sink, Path(tmp_dir)))
+        total = time.perf_counter() - start
+    print("\n--- export_all CPU time per format ---")
+    for format_name, seconds in timings.items():
+        print(f"{format_name:<5} {seconds * 1000:8.1f} ms")
+    print(f"{'wall':<5} {total * 1000:8.1f} ms")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,116 @@
+import importlib
+import io
+import json
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+import typer
+
+from discovery import entry_point_manifest
+from manifest import find_modules, load_manifest
+from registry import BatchFunc, get_batch_handler, get_command
+
+# Records handed to the pool per round; bounds memory for unbounded input
+# while keeping every worker busy.
+RECORDS_PER_WORKER = 4096
+
+
+def load_command(group: str, name: str) -> None:
+    """Import the module(s) of one command unless it is registered already."""
+    if get_command(group, name) is None:
+        for module in find_modules(load_manifest() + entry_point_manifest(), group, name):
+            importlib.import_module(module)
+
+
+class PlainTextCommand:
+    """Batch handler for a command registered without `batch=`.
+
+    Runs the normal command and returns what it printed through Rich, as
+    plain text without markup. Slower than a `batch=` handler, which skips
+    Rich altogether. Holds only the command's key, so it pickles to workers.
+    """
+
+    def __init__(self, group: str, name: str) -> None:
+        self.group = group
+        self.name = name
+
+    def __call__(self, record: str) -> str:
+        load_command(self.group, self.name)
+        command = get_command(self.group, self.name)
+        console = _plain_console()
+        console.file = io.StringIO()
+        try:
+            command(record)
+            return console.file.getvalue().rstrip("\n")
+        finally:
+            console.file = None  # back to sys.stdout
+
+
+def _plain_console():
+    # The global console `rich.print` writes to, without colors or wrapping.
+    import rich
+
+    console = rich.get_console()
+    if console.color_system is not None or not console.soft_wrap:
+        rich.reconfigure(color_system=None, soft_wrap=True)
+    return console
+
+
+def iter_records(files: list[str]) -> Iterator[str]:
+    """Yield one record per line from the files, or from stdin for none/'-'."""
+    for path in files or ["-"]:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in stream:
+                yield line.rstrip("\n")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def _results(handler: BatchFunc, records: Iterable[str], workers: int) -> Iterator[tuple[str, object]]:
+    if workers <= 1:
+        for record in records:
+            yield record, handler(record)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    iterator = iter(records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while window := list(islice(iterator, workers * RECORDS_PER_WORKER)):
+            # `map` yields in input order, so output order matches the input.
+            chunksize = max(len(window) // (workers * 4), 1)
+            yield from zip(window, pool.map(handler, window, chunksize=chunksize))
+
+
+def run_batch(
+    handler: BatchFunc, records: Iterable[str], out: TextIO, workers: int = 1, ndjson: bool = False
+) -> int:
+    count = 0
+    for record, result in _results(handler, records, workers):
+        if ndjson:
+            out.write(json.dumps({"input": record, "output": result}, ensure_ascii=False))
+        else:
+            out.write(str(result))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def batch_command(
+    group: str,
+    name: str,
+    files: list[str] = typer.Argument(None, help="Input files, one record per line; stdin if omitted."),
+    ndjson: bool = typer.Option(False, "--ndjson", help="Write one JSON object per record."),
+    workers: int = typer.Option(1, "--workers", min=1, help="Process records in N worker processes."),
+) -> None:
+    """Run a text command over every line of stdin or the given files."""
+    # Typer has parsed GROUP and NAME wherever the options were, so only
+    # this command's module is imported, as in a lazy single run.
+    load_command(group, name)
+    if get_command(group, name) is None:
+        raise typer.BadParameter(f"Unknown command '{group} {name}'.", param_hint="GROUP NAME")
+    handler = get_batch_handler(group, name) or PlainTextCommand(group, name)
+    run_batch(handler, iter_records(files or []), sys.stdout, workers=workers, ndjson=ndjson)
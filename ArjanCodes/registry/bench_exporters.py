@@ -0,0 +1,44 @@
+import timeit
+from functools import wraps
+
+from basic_example import Data, ExportFn, export_data, export_to_csv, exporters
+
+CALLS = 200_000
+REPEAT = 7
+SAMPLE: Data = {"name": "John Doe", "age": 30, "city": "New York"}
+
+
+def wrapped(func: ExportFn) -> ExportFn:
+    # How `register_exporter` used to store every exporter.
+    @wraps(func)
+    def wrapper(data: Data) -> str:
+        return func(data)
+
+    return wrapper
+
+
+def trivial_exporter(data: Data) -> str:
+    return ""
+
+
+def main() -> None:
+    # A no-op exporter isolates dispatch cost from the export work itself.
+    exporters["noop"] = trivial_exporter
+    old_registry: dict[str, ExportFn] = {"noop": wrapped(trivial_exporter), "csv": wrapped(export_to_csv)}
+
+    def old_export_data(data: Data, format_name: str) -> str:
+        if format_name not in old_registry:
+            raise ValueError(f"Exporter for format '{format_name}' is not registered.")
+        return old_registry[format_name](data)
+
+    for format_name in ("noop", "csv"):
+        old = min(timeit.repeat(lambda: old_export_data(SAMPLE, format_name), number=CALLS, repeat=REPEAT))
+        new = min(timeit.repeat(lambda: export_data(SAMPLE, format_name), number=CALLS, repeat=REPEAT))
+        print(
+            f"{format_name:<5} wrapper {old / CALLS * 1e9:7.1f} ns/call   "
+            f"direct {new / CALLS * 1e9:7.1f} ns/call"
+        )
+
+
+if __name__ == "__main__":
+    main()
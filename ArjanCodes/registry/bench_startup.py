@@ -0,0 +1,37 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+RUNS = 20
+INVOCATIONS = {
+    "help": ["--help"],
+    "count": ["text", "count", "This is a registry pattern example"],
+}
+
+
+def time_invocation(args: list[str], eager: bool) -> float:
+    env = {**os.environ, "REGISTRY_EAGER": "1" if eager else "0"}
+    samples: list[float] = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", *args],
+            cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, check=True,
+        )
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    for label, args in INVOCATIONS.items():
+        eager = time_invocation(args, eager=True)
+        lazy = time_invocation(args, eager=False)
+        print(f"{label:<6} eager {eager * 1000:7.1f} ms   lazy {lazy * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+# Kept to the standard library so that starting the client costs little more
+# than starting the interpreter.
+SOCKET_NAME = "registry.sock"
+
+
+def socket_dir() -> str:
+    """A directory only the current user can reach: $XDG_RUNTIME_DIR, or a private one in /tmp."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return runtime_dir
+    path = os.path.join(tempfile.gettempdir(), f"registry-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    # Someone else may have created it first; never trust a directory we do not own.
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory owned and only accessible by uid {os.getuid()}")
+    return path
+
+
+def socket_path() -> str:
+    return os.environ.get("REGISTRY_SOCKET") or os.path.join(socket_dir(), SOCKET_NAME)
+
+
+# struct xucred on macOS and the BSDs: version, uid, group count, groups.
+XUCRED = "IIh16I"
+SOL_LOCAL = 0
+
+
+def peer_uid(sock: socket.socket) -> int:
+    """User id of the process on the other end of a connected Unix socket.
+
+    Asked from the kernel (SO_PEERCRED on Linux, LOCAL_PEERCRED on macOS and
+    the BSDs); where neither exists the peer cannot be verified, which
+    raises PermissionError.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", credentials)[1]
+    if hasattr(socket, "LOCAL_PEERCRED"):
+        credentials = sock.getsockopt(SOL_LOCAL, socket.LOCAL_PEERCRED, struct.calcsize(XUCRED))
+        return struct.unpack_from("II", credentials)[1]
+    raise PermissionError("cannot check who owns a Unix socket connection on this platform")
+
+
+def forward(argv: list[str], path: str | None = None) -> int:
+    """Run `main.py <argv>` in the daemon and return its exit code.
+
+    The client's stdin/stdout/stderr file descriptors are passed over the Unix
+    socket, so the command reads and writes them directly. They are only sent
+    once the listening process is known to run as the same user.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path or socket_path())
+        if peer_uid(sock) != os.getuid():
+            raise PermissionError("registry daemon socket is owned by another user")
+        request = json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n"
+        socket.send_fds(sock, [request], [0, 1, 2])
+        response = b""
+        while len(response) < 4:
+            chunk = sock.recv(4 - len(response))
+            if not chunk:
+                raise ConnectionError("registry daemon closed the connection")
+            response += chunk
+    return int.from_bytes(response, "big", signed=True)
+
+
+def main() -> None:
+    try:
+        exit_code = forward(sys.argv[1:])
+    except (FileNotFoundError, ConnectionRefusedError, PermissionError) as error:
+        # No usable daemon: fall back to a normal, in-process run.
+        if isinstance(error, PermissionError):
+            print(f"Not using the registry daemon: {error}", file=sys.stderr)
+        import main as cli
+
+        cli.main()
+        return
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ from registry import register_command
 from rich import print
 
 
-@register_command("text", "count")
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+@register_command("text", "count", batch=word_count)
 def count_words(text: str) -> None:
-    word_count = len(text.split())
-    print(f"[green]Word count:[/green] [bold]{word_count}[/bold]")
+    print(f"[green]Word count:[/green] [bold]{word_count(text)}[/bold]")
@@ -2,7 +2,11 @@ from registry import register_command
 from rich import print
 
 
-@register_command("text", "reverse")
+def reverse(text: str) -> str:
+    return text[::-1]
+
+
+@register_command("text", "reverse", batch=reverse)
 def reverse_text(text: str) -> None:
-    reversed_text = text[::-1]
+    reversed_text = reverse(text)
     print(f"[cyan]Reversed:[/cyan] [bold]{reversed_text}[/bold]")
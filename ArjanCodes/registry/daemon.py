@@ -0,0 +1,116 @@
+import contextlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+
+import rich
+
+import main as cli
+from client import peer_uid, socket_path
+from registry import get_registry
+
+
+class ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+class CommandHandler(socketserver.BaseRequestHandler):
+    """Runs one command in a process forked from the warm daemon."""
+
+    def handle(self) -> None:
+        try:
+            if peer_uid(self.request) != os.getuid():
+                return
+        except OSError:
+            return
+        message, fds, _, _ = socket.recv_fds(self.request, 65536, 3)
+        while not message.endswith(b"\n"):
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return
+            message += chunk
+        request = json.loads(message)
+
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        # Rebuild the global Rich console so it detects the client's terminal.
+        rich.reconfigure()
+
+        exit_code = run_command(request["argv"])
+        self.request.sendall(exit_code.to_bytes(4, "big", signed=True))
+
+    def finish(self) -> None:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def run_command(argv: list[str]) -> int:
+    try:
+        cli.app(args=argv, prog_name="main.py")
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return 0
+
+
+def warm_up() -> None:
+    # Typer/Click/Rich import and build a lot on the first invocation; do that
+    # once here so each forked child starts from the warmed-up state.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        for group, name in list(get_registry())[:1]:
+            run_command([group, name, "--help"])
+        run_command(["--help"])
+
+
+def remove_stale_socket(path: str) -> None:
+    """Unlink a socket left by a daemon that is gone; refuse if one still answers."""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise SystemExit(f"A registry daemon is already listening on {path}")
+
+
+def serve(path: str | None = None) -> None:
+    if not (hasattr(socket, "SO_PEERCRED") or hasattr(socket, "LOCAL_PEERCRED")):
+        raise SystemExit("The registry daemon needs SO_PEERCRED or LOCAL_PEERCRED to check its callers.")
+    path = path or socket_path()
+    remove_stale_socket(path)
+    # Pay for Typer, Rich and every command import once, before forking.
+    cli.load_text_commands()
+    cli.load_plugins()
+    cli.registry_with_typer()
+    warm_up()
+
+    with ForkingUnixServer(path, CommandHandler) as server:
+        os.chmod(path, 0o600)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        print(f"Registry daemon listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else None)
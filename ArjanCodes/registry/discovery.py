@@ -0,0 +1,92 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from manifest import Entry
+
+# Third-party packages register commands with entry points named "<group>.<name>":
+#
+#   [project.entry-points."registry.commands"]
+#   "text.upper" = "my_package.commands:upper"
+#
+# The module is imported only when that command runs; `@register_command`
+# still does the actual registration on import.
+ENTRY_POINT_GROUP = "registry.commands"
+CACHE_VERSION = 1
+CACHE_FILE = Path(__file__).with_name(".entry_point_cache.json")
+
+
+def distributions_fingerprint() -> str:
+    """Hash the installed distributions from their metadata directory names.
+
+    The names contain the project name and version, so installing, upgrading
+    or removing a package changes the hash, and only `sys.path` directories
+    are listed; no metadata file is opened.
+    """
+    digest = hashlib.sha256()
+    for path_entry in sys.path:
+        try:
+            names = sorted(
+                name for name in os.listdir(path_entry or ".")
+                if name.endswith((".dist-info", ".egg-info"))
+            )
+        except OSError:
+            continue
+        digest.update(path_entry.encode())
+        for name in names:
+            digest.update(name.encode())
+    return digest.hexdigest()
+
+
+def _scan_entry_points() -> list[dict[str, str]]:
+    # Imported here: importlib.metadata is slow to import, and a cache hit never needs it.
+    import importlib.metadata
+
+    return [
+        {"name": entry_point.name, "value": entry_point.value}
+        for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP)
+    ]
+
+
+def discover_entry_points() -> list[dict[str, str]]:
+    fingerprint = distributions_fingerprint()
+    try:
+        cached = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        if cached.get("version") == CACHE_VERSION and cached.get("fingerprint") == fingerprint:
+            return cached["entry_points"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    entry_points = _scan_entry_points()
+    try:
+        CACHE_FILE.write_text(
+            json.dumps({"version": CACHE_VERSION, "fingerprint": fingerprint, "entry_points": entry_points}, indent=2),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+    return entry_points
+
+
+def entry_point_manifest() -> list[Entry]:
+    """Manifest entries for the discovered entry points, without importing them."""
+    entries: list[Entry] = []
+    for entry_point in discover_entry_points():
+        group, _, name = entry_point["name"].partition(".")
+        if not name:
+            continue
+        entries.append({
+            "group": group,
+            "name": name,
+            "module": entry_point["value"].partition(":")[0].strip(),
+            "help": "",
+        })
+    return entries
+
+
+def load_entry_point_plugins() -> None:
+    for entry in entry_point_manifest():
+        importlib.import_module(entry["module"])
@@ -1,10 +1,23 @@
 import importlib
+import os
 import pkgutil
+import sys
+from typing import Callable, Iterable
+
 import typer
 
-from registry import get_registry
+from batch import batch_command
+from discovery import entry_point_manifest, load_entry_point_plugins
+from manifest import Entry, find_modules, load_manifest
+from registry import get_registry, resolve_name
 
 app = typer.Typer()
+app.command(name="batch")(batch_command)
+
+# Set REGISTRY_EAGER=1 to import every command module up front.
+EAGER = os.environ.get("REGISTRY_EAGER") == "1"
+
+Command = tuple[str, str, Callable[..., None]]
 
 
 def load_text_commands() -> None:
@@ -19,11 +32,50 @@ def load_plugins() -> None:
     
     for _, module_name, _ in pkgutil.iter_modules(plugins.__path__):
         importlib.import_module(f"plugins.{module_name}")
+    load_entry_point_plugins()
+
+
+def placeholder_command(help_text: str) -> Callable[..., None]:
+    def placeholder() -> None:
+        pass
+
+    placeholder.__doc__ = help_text or None
+    return placeholder
+
+
+def load_lazy(argv: list[str]) -> list[Command]:
+    """Import only the module of the invoked command.
+
+    When argv does not name a known command (e.g. `--help`), every command
+    is listed from the manifest with a placeholder and nothing is imported.
+    """
+    manifest = load_manifest() + entry_point_manifest()
+    # `batch` imports its command itself, from the arguments Typer parsed.
+    if len(argv) >= 2:
+        modules = find_modules(manifest, argv[0], argv[1])
+        if modules:
+            for module in modules:
+                importlib.import_module(module)
+            return [(group, name, func) for (group, name), func in get_registry().items()]
+    return list_manifest(manifest)
+
+
+def list_manifest(manifest: list[Entry]) -> list[Command]:
+    # Name the placeholders the way registering the real commands would, so
+    # duplicates follow the conflict policy instead of being listed twice.
+    listed: dict[tuple[str, str], Callable[..., None]] = {}
+    for entry in manifest:
+        placeholder = placeholder_command(entry["help"])
+        placeholder.__module__ = entry["module"]
+        listed[(entry["group"], resolve_name(listed, entry["group"], entry["name"], placeholder))] = placeholder
+    return [(group, name, func) for (group, name), func in listed.items()]
 
 
-def registry_with_typer() -> None:
+def registry_with_typer(commands: Iterable[Command] | None = None) -> None:
     group_apps: dict[str, typer.Typer] = {}
-    for group, name, func in get_registry():
+    if commands is None:
+        commands = [(group, name, func) for (group, name), func in get_registry().items()]
+    for group, name, func in commands:
         if group not in group_apps:
             group_apps[group] = typer.Typer(name=group)
             app.add_typer(group_apps[group], name=group)
@@ -31,9 +83,12 @@ def registry_with_typer() -> None:
 
 
 def main() -> None:
-    load_text_commands()
-    load_plugins()
-    registry_with_typer()
+    if EAGER:
+        load_text_commands()
+        load_plugins()
+        registry_with_typer()
+    else:
+        registry_with_typer(load_lazy(sys.argv[1:]))
     app()
     
 
@@ -0,0 +1,172 @@
+import ast
+import importlib
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Any
+
+MANIFEST_VERSION = 2
+BASE_DIR = Path(__file__).parent
+MANIFEST_FILE = BASE_DIR / ".command_manifest.json"
+COMMAND_PACKAGES = ("commands.text", "plugins")
+
+Entry = dict[str, str]
+
+
+def _package_modules(package: str) -> dict[str, Path]:
+    # Same modules `pkgutil.iter_modules` would find, without importing the package.
+    package_dir = BASE_DIR.joinpath(*package.split("."))
+    return {
+        f"{package}.{path.stem}": path
+        for path in sorted(package_dir.glob("*.py"))
+        if path.stem != "__init__"
+    }
+
+
+def _scan_module(module: str, path: Path) -> list[Entry]:
+    """Find `@register_command(group, name)` functions by parsing the source.
+
+    Arguments may be positional or keywords, and `register_command` may be
+    imported under another name. When a module uses `register_command` in a
+    way that cannot be read statically (computed arguments, a call outside
+    a decorator), it is imported and its registered commands are listed.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    aliases = _register_command_aliases(tree)
+    entries: list[Entry] = []
+    unresolved = False
+    decorators = 0
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and _is_register_command(decorator.func, aliases)):
+                continue
+            decorators += 1
+            arguments = _group_and_name(decorator)
+            if arguments is None:
+                unresolved = True
+                continue
+            docstring = ast.get_docstring(node) or ""
+            entries.append({
+                "group": arguments[0],
+                "name": arguments[1],
+                "module": module,
+                "help": docstring.splitlines()[0] if docstring else "",
+            })
+    calls = sum(
+        isinstance(node, ast.Call) and _is_register_command(node.func, aliases) for node in ast.walk(tree)
+    )
+    if unresolved or calls > decorators or (not entries and aliases):
+        return _import_module_entries(module)
+    return entries
+
+
+def _register_command_aliases(tree: ast.Module) -> set[str]:
+    # Names `register_command` is bound to, e.g. {"command"} for
+    # `from registry import register_command as command`.
+    aliases: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            aliases.update(alias.asname or alias.name for alias in node.names if alias.name == "register_command")
+        elif isinstance(node, ast.Name) and node.id == "register_command":
+            aliases.add(node.id)
+        elif isinstance(node, ast.Attribute) and node.attr == "register_command":
+            aliases.add(node.attr)
+    return aliases
+
+
+def _is_register_command(func: ast.expr, aliases: set[str]) -> bool:
+    if isinstance(func, ast.Name):
+        return func.id in aliases
+    return isinstance(func, ast.Attribute) and func.attr == "register_command"
+
+
+def _group_and_name(decorator: ast.Call) -> tuple[str, str] | None:
+    # Same binding as register_command(group, name, ...); None unless both are literal strings.
+    values: dict[str, object] = dict(zip(("group", "name"), decorator.args))
+    values.update((keyword.arg, keyword.value) for keyword in decorator.keywords if keyword.arg in ("group", "name"))
+    group, name = values.get("group"), values.get("name")
+    if not (isinstance(group, ast.Constant) and isinstance(name, ast.Constant)):
+        return None
+    if not (isinstance(group.value, str) and isinstance(name.value, str)):
+        return None
+    return group.value, name.value
+
+
+def _import_module_entries(module: str) -> list[Entry]:
+    # Only needed for modules the parser cannot read, so kept off the startup path.
+    import inspect
+
+    from registry import get_registry
+
+    try:
+        importlib.import_module(module)
+    except Exception as error:
+        warnings.warn(f"Could not list the commands of {module}: {error}", RuntimeWarning)
+        return []
+    entries: list[Entry] = []
+    for (group, name), func in get_registry().items():
+        if func.__module__ != module:
+            continue
+        docstring = inspect.getdoc(func) or ""
+        entries.append({
+            "group": group,
+            "name": name,
+            "module": module,
+            "help": docstring.splitlines()[0] if docstring else "",
+        })
+    if not entries:
+        warnings.warn(f"{module} uses register_command but registered no commands.", RuntimeWarning)
+    return entries
+
+
+def _read_cache() -> dict[str, Any]:
+    try:
+        cached = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cached if cached.get("version") == MANIFEST_VERSION else {}
+
+
+def load_manifest() -> list[Entry]:
+    """Return every registered command, rescanning only modules whose mtime changed."""
+    cached = _read_cache()
+    cached_files: dict[str, dict[str, Any]] = cached.get("files", {})
+
+    files: dict[str, dict[str, Any]] = {}
+    changed = False
+    for package in COMMAND_PACKAGES:
+        for module, path in _package_modules(package).items():
+            mtime = os.stat(path).st_mtime_ns
+            previous = cached_files.get(module)
+            if previous and previous["mtime"] == mtime:
+                files[module] = previous
+            else:
+                files[module] = {"mtime": mtime, "commands": _scan_module(module, path)}
+                changed = True
+
+    if changed or files.keys() != cached_files.keys():
+        try:
+            MANIFEST_FILE.write_text(
+                json.dumps({"version": MANIFEST_VERSION, "files": files}, indent=2),
+                encoding="utf-8",
+            )
+        except OSError:
+            pass  # A read-only checkout still works, it just rescans every run.
+
+    return [entry for info in files.values() for entry in info["commands"]]
+
+
+def find_modules(manifest: list[Entry], group: str, name: str) -> list[str]:
+    """Modules to import, in manifest order, for the command `group name`.
+
+    A namespaced name ("<package>:<name>") needs every module registering the
+    plain name: it only gets its prefix by colliding with the earlier one.
+    """
+    package, _, plain_name = name.rpartition(":")
+    modules = [entry["module"] for entry in manifest if entry["group"] == group and entry["name"] == plain_name]
+    if package and not any(module.split(".")[0] == package for module in modules):
+        return []
+    return modules
@@ -0,0 +1,15 @@
+from typing import Any, Dict, Iterable, TextIO
+
+Data = Dict[str, Any]
+
+
+def export_to_pdf(data: Data) -> str:
+    lines = [f"{key}: {value}\n" for key, value in data.items()]
+    return "PDF Document\n\n" + "".join(lines)
+
+
+def stream_to_pdf(records: Iterable[Data], sink: TextIO) -> None:
+    sink.write("PDF Document\n\n")
+    for record in records:
+        sink.writelines(f"{key}: {value}\n" for key, value in record.items())
+        sink.write("\n")
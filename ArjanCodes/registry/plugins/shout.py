@@ -2,6 +2,10 @@ from registry import register_command
 from rich import print
 
 
-@register_command("text", "shout")
+def shouted(text: str) -> str:
+    return f"{text.upper()}!!!"
+
+
+@register_command("text", "shout", batch=shouted)
 def shout(text: str) -> None:
-    print(f"[bold red]{text.upper()}!!![/bold red]")
+    print(f"[bold red]{shouted(text)}[/bold red]")
@@ -1,15 +1,94 @@
-from typing import Callable
+from types import MappingProxyType
+from typing import Callable, Literal, Mapping
 
+CommandFunc = Callable[..., None]
+# Plain-data version of a text command used by `main.py batch`: takes one
+# record and returns its result instead of printing it with Rich.
+BatchFunc = Callable[[str], object]
+# What happens when a (group, name) pair is registered twice:
+#   "error"     raise CommandConflictError
+#   "override"  the later registration replaces the earlier one
+#   "namespace" the later one is registered as "<top-level package>:<name>"
+ConflictPolicy = Literal["error", "override", "namespace"]
 
-_registry: list[tuple[str, str, Callable[..., None]]] = []
 
+class CommandConflictError(ValueError):
+    pass
 
-def register_command(group: str, name: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
-    def decorator(func: Callable[..., None]) -> Callable[..., None]:
-        _registry.append((group, name, func))
+
+_registry: dict[tuple[str, str], CommandFunc] = {}
+_groups: dict[str, dict[str, CommandFunc]] = {}
+_batch_handlers: dict[tuple[str, str], BatchFunc] = {}
+_conflict_policy: ConflictPolicy = "error"
+
+
+def set_conflict_policy(policy: ConflictPolicy) -> None:
+    global _conflict_policy
+    if policy not in ("error", "override", "namespace"):
+        raise ValueError(f"Unknown conflict policy '{policy}'.")
+    _conflict_policy = policy
+
+
+def resolve_name(
+    commands: Mapping[tuple[str, str], CommandFunc],
+    group: str,
+    name: str,
+    func: CommandFunc,
+    policy: ConflictPolicy | None = None,
+) -> str:
+    """Name `func` gets when it is added to `commands` as (group, name).
+
+    Under "namespace" the `<package>:<name>` key must be free as well; a
+    second collision on it raises CommandConflictError instead of replacing
+    the earlier namespaced command.
+    """
+    policy = policy or _conflict_policy
+    existing = commands.get((group, name))
+    if existing is None or existing is func or policy == "override":
+        return name
+    if policy == "namespace":
+        namespaced = f"{func.__module__.split('.')[0]}:{name}"
+        taken = commands.get((group, namespaced))
+        if taken is None or taken is func:
+            return namespaced
+        name, existing = namespaced, taken
+    raise CommandConflictError(
+        f"Command '{group} {name}' from {func.__module__} is already "
+        f"registered by {existing.__module__}."
+    )
+
+
+def register_command(
+    group: str,
+    name: str,
+    on_conflict: ConflictPolicy | None = None,
+    batch: BatchFunc | None = None,
+) -> Callable[[CommandFunc], CommandFunc]:
+    def decorator(func: CommandFunc) -> CommandFunc:
+        command_name = resolve_name(_registry, group, name, func, on_conflict)
+        _registry[(group, command_name)] = func
+        _groups.setdefault(group, {})[command_name] = func
+        if batch is not None:
+            _batch_handlers[(group, command_name)] = batch
+        else:
+            _batch_handlers.pop((group, command_name), None)
         return func
 
     return decorator
 
-def get_registry() -> list[tuple[str, str, Callable[..., None]]]:
-    return _registry.copy()
+
+def get_registry() -> Mapping[tuple[str, str], CommandFunc]:
+    """Read-only live view of every command, keyed by (group, name)."""
+    return MappingProxyType(_registry)
+
+
+def get_group(group: str) -> Mapping[str, CommandFunc]:
+    return MappingProxyType(_groups.get(group, {}))
+
+
+def get_command(group: str, name: str) -> CommandFunc | None:
+    return _registry.get((group, name))
+
+
+def get_batch_handler(group: str, name: str) -> BatchFunc | None:
+    return _batch_handlers.get((group, name))
@@ -0,0 +1,374 @@
+import csv
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+import basic_example
+import batch
+import client
+import daemon
+import discovery
+import manifest
+from main import list_manifest
+from manifest import find_modules
+from registry import CommandConflictError, get_command, get_group, register_command, resolve_name, set_conflict_policy
+
+
+def command_from(module: str):
+    def command() -> None:
+        pass
+
+    command.__module__ = module
+    return command
+
+
+def test_error_policy_rejects_duplicates() -> None:
+    first = register_command("test-error", "run", on_conflict="error")(command_from("first.commands"))
+    with pytest.raises(CommandConflictError):
+        register_command("test-error", "run", on_conflict="error")(command_from("second.commands"))
+    # Registering the same function again is not a conflict.
+    register_command("test-error", "run", on_conflict="error")(first)
+    assert get_command("test-error", "run") is first
+
+
+def test_override_policy_replaces_earlier_command() -> None:
+    register_command("test-override", "run", on_conflict="override")(command_from("first.commands"))
+    second = register_command("test-override", "run", on_conflict="override")(command_from("second.commands"))
+    assert get_command("test-override", "run") is second
+    assert list(get_group("test-override")) == ["run"]
+
+
+def test_namespace_policy_prefixes_the_package() -> None:
+    first = register_command("test-namespace", "run", on_conflict="namespace")(command_from("first.commands"))
+    second = register_command("test-namespace", "run", on_conflict="namespace")(command_from("second.commands"))
+    assert get_command("test-namespace", "run") is first
+    assert get_command("test-namespace", "second:run") is second
+    # A second collision on the namespaced key must not replace it.
+    with pytest.raises(CommandConflictError):
+        register_command("test-namespace", "run", on_conflict="namespace")(command_from("second.other"))
+    assert get_command("test-namespace", "second:run") is second
+
+
+def test_resolve_name_follows_policy() -> None:
+    commands = {("text", "run"): command_from("first.commands")}
+    other = command_from("second.commands")
+    assert resolve_name(commands, "text", "run", other, "override") == "run"
+    assert resolve_name(commands, "text", "run", other, "namespace") == "second:run"
+    with pytest.raises(CommandConflictError):
+        resolve_name(commands, "text", "run", other, "error")
+
+
+def test_lazy_listing_and_lookup_of_namespaced_commands() -> None:
+    manifest = [
+        {"group": "text", "name": "run", "module": "first.commands", "help": ""},
+        {"group": "text", "name": "run", "module": "second.commands", "help": ""},
+    ]
+    set_conflict_policy("namespace")
+    try:
+        listed = [(group, name) for group, name, _ in list_manifest(manifest)]
+    finally:
+        set_conflict_policy("error")
+    assert listed == [("text", "run"), ("text", "second:run")]
+    assert find_modules(manifest, "text", "second:run") == ["first.commands", "second.commands"]
+    assert find_modules(manifest, "text", "third:run") == []
+
+
+def test_entry_point_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    scans: list[int] = []
+
+    def scan() -> list[dict[str, str]]:
+        scans.append(1)
+        return [{"name": "text.upper", "value": "example_plugin.commands:upper"}]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        monkeypatch.setattr(discovery, "CACHE_FILE", Path(tmp_dir) / "entry_points.json")
+        monkeypatch.setattr(discovery, "_scan_entry_points", scan)
+        monkeypatch.setattr(discovery, "distributions_fingerprint", lambda: "installed-1")
+        assert discovery.discover_entry_points() == discovery.discover_entry_points()
+        assert len(scans) == 1
+        assert json.loads(discovery.CACHE_FILE.read_text())["fingerprint"] == "installed-1"
+
+        # Installing or removing a distribution changes the fingerprint.
+        monkeypatch.setattr(discovery, "distributions_fingerprint", lambda: "installed-2")
+        discovery.discover_entry_points()
+        assert len(scans) == 2
+        assert discovery.entry_point_manifest() == [
+            {"group": "text", "name": "upper", "module": "example_plugin.commands", "help": ""}
+        ]
+
+
+def test_cached_discovery_skips_importlib_metadata() -> None:
+    # The first run fills the cache; the second only reads it.
+    code = "import sys, discovery; discovery.discover_entry_points(); print('importlib.metadata' in sys.modules)"
+    for _ in range(2):
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, cwd=Path(__file__).parent, check=True
+        )
+    assert result.stdout.strip() == "False"
+
+
+def scan_source(source: str, module: str = "scanned") -> list[dict[str, str]]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / f"{module}.py"
+        path.write_text(source, encoding="utf-8")
+        return manifest._scan_module(module, path)
+
+
+def test_manifest_reads_decorators_statically() -> None:
+    source = (
+        "import registry\n"
+        "from registry import register_command\n"
+        "from registry import register_command as command\n\n"
+        "@register_command('text', 'plain')\n"
+        "def plain(text: str) -> None:\n"
+        "    \"\"\"Plain command.\n\n    More help.\"\"\"\n\n"
+        "@command(group='text', name='keywords')\n"
+        "def keywords(text: str) -> None: ...\n\n"
+        "@registry.register_command('text', name='attribute')\n"
+        "async def attribute(text: str) -> None: ...\n"
+    )
+    entries = scan_source(source)
+    assert [(entry["group"], entry["name"]) for entry in entries] == [
+        ("text", "plain"), ("text", "keywords"), ("text", "attribute")
+    ]
+    assert entries[0]["help"] == "Plain command."
+    assert scan_source("def helper() -> None: ...\n") == []
+
+
+def test_manifest_imports_modules_it_cannot_read() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sys.path.insert(0, tmp_dir)
+        try:
+            dynamic = Path(tmp_dir) / "manifest_dynamic.py"
+            dynamic.write_text(
+                "from registry import register_command\n"
+                "NAME = 'dynamic'\n\n"
+                "def run(text: str) -> None:\n"
+                "    \"\"\"Computed name.\"\"\"\n\n"
+                "register_command('test-manifest', NAME)(run)\n",
+                encoding="utf-8",
+            )
+            assert manifest._scan_module("manifest_dynamic", dynamic) == [
+                {"group": "test-manifest", "name": "dynamic", "module": "manifest_dynamic", "help": "Computed name."}
+            ]
+
+            broken = Path(tmp_dir) / "manifest_broken.py"
+            broken.write_text("from registry import register_command\nraise RuntimeError('boom')\n", encoding="utf-8")
+            with pytest.warns(RuntimeWarning, match="boom"):
+                assert manifest._scan_module("manifest_broken", broken) == []
+        finally:
+            sys.path.remove(tmp_dir)
+
+
+def test_manifest_lists_the_bundled_commands() -> None:
+    entries = manifest.load_manifest()
+    assert {("text", "count"), ("text", "reverse"), ("text", "shout")} <= {
+        (entry["group"], entry["name"]) for entry in entries
+    }
+    assert find_modules(entries, "text", "count") == ["commands.text.count"]
+
+
+def test_peer_uid_comes_from_the_kernel() -> None:
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert client.peer_uid(left) == client.peer_uid(right) == os.getuid()
+
+
+def test_socket_dir_must_be_private(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr(client.tempfile, "gettempdir", lambda: tmp_dir)
+        private = client.socket_dir()
+        assert os.stat(private).st_mode & 0o777 == 0o700
+        os.chmod(private, 0o755)
+        with pytest.raises(PermissionError):
+            client.socket_dir()
+        monkeypatch.setenv("XDG_RUNTIME_DIR", tmp_dir)
+        assert client.socket_dir() == tmp_dir
+
+
+def test_daemon_runs_commands_and_refuses_a_second_start() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chmod(tmp_dir, 0o700)
+        socket_path = os.path.join(tmp_dir, "registry.sock")
+        here = Path(__file__).parent
+        server = subprocess.Popen(
+            [sys.executable, "daemon.py", socket_path],
+            cwd=here, stdin=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            assert "listening" in server.stderr.readline()
+            env = {**os.environ, "REGISTRY_SOCKET": socket_path}
+            result = subprocess.run(
+                [sys.executable, "client.py", "text", "count", "one two three"],
+                cwd=here, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True,
+            )
+            assert "3" in result.stdout
+            with pytest.raises(SystemExit, match="already listening"):
+                daemon.remove_stale_socket(socket_path)
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                raise
+
+        # A socket nobody listens on is left over and can be replaced.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(socket_path)
+        daemon.remove_stale_socket(socket_path)
+        assert not os.path.exists(socket_path)
+
+
+def plain_upper(text: str) -> str:
+    return text.upper()
+
+
+def test_run_batch_keeps_input_order() -> None:
+    records = [f"record {i}" for i in range(1000)]
+    for workers in (1, 3):
+        out = io.StringIO()
+        assert batch.run_batch(plain_upper, records, out, workers=workers) == len(records)
+        assert out.getvalue().splitlines() == [record.upper() for record in records]
+    out = io.StringIO()
+    batch.run_batch(plain_upper, ["a b"], out, ndjson=True)
+    assert json.loads(out.getvalue()) == {"input": "a b", "output": "A B"}
+
+
+def test_batch_runs_commands_without_a_batch_handler() -> None:
+    import rich
+
+    @register_command("test-batch", "fancy")
+    def fancy(text: str) -> None:
+        rich.print(f"[bold red]Fancy:[/bold red] {text} " + "x" * 100)
+
+    handler = batch.PlainTextCommand("test-batch", "fancy")
+    assert handler("hi") == "Fancy: hi " + "x" * 100  # no markup, no wrapping
+
+
+def test_batch_cli_with_options_before_the_command() -> None:
+    here = Path(__file__).parent
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = Path(tmp_dir) / "corpus.txt"
+        corpus.write_text("one two\nthree\n", encoding="utf-8")
+        for eager in ("0", "1"):
+            result = subprocess.run(
+                [sys.executable, "main.py", "batch", "--ndjson", "--workers", "2", "text", "count", str(corpus)],
+                cwd=here, env={**os.environ, "REGISTRY_EAGER": eager},
+                stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True,
+            )
+            assert [json.loads(line)["output"] for line in result.stdout.splitlines()] == [2, 1]
+
+
+RECORDS = [{"id": i, "name": f"User <{i}>", "city": "New York"} for i in range(3)]
+
+
+def test_stream_exporters_write_every_record() -> None:
+    outputs = {}
+    for format_name in ("json", "csv", "xml", "yaml", "pdf"):
+        sink = io.StringIO()
+        # A generator checks the writers need only one pass over the records.
+        basic_example.export_stream((record for record in RECORDS), format_name, sink)
+        outputs[format_name] = sink.getvalue()
+    assert json.loads(outputs["json"]) == RECORDS
+    assert list(csv.DictReader(io.StringIO(outputs["csv"]))) == [
+        {key: str(value) for key, value in record.items()} for record in RECORDS
+    ]
+    assert "<name>User &lt;2&gt;</name>" in outputs["xml"]
+    assert outputs["yaml"].count("- id: ") == 3
+    assert outputs["pdf"].startswith("PDF Document") and "name: User <1>" in outputs["pdf"]
+
+    empty = io.StringIO()
+    basic_example.export_stream([], "json", empty)
+    assert json.loads(empty.getvalue()) == []
+
+
+def test_stream_exporters_resolve_mime_types() -> None:
+    assert basic_example.resolve_stream_exporter("text/csv") is basic_example.stream_to_csv
+    sink = io.StringIO()
+    basic_example.export_stream(RECORDS, "application/json", sink)
+    assert json.loads(sink.getvalue()) == RECORDS
+    with pytest.raises(ValueError, match="not registered"):
+        basic_example.export_stream(RECORDS, "text/html", io.StringIO())
+
+
+def test_export_all_in_a_process_pool() -> None:
+    records = [{"id": i, "name": f"User {i}", "city": "New York"} for i in range(1000)]
+    formats = basic_example.stream_exporter_formats()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sink_factory = partial(basic_example.open_file_sink, Path(tmp_dir))
+        for executor in (ProcessPoolExecutor(max_workers=2), ThreadPoolExecutor(max_workers=2), None):
+            for path in Path(tmp_dir).iterdir():
+                path.unlink()
+            try:
+                timings = basic_example.export_all(records, formats, sink_factory, executor)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+            assert list(timings) == formats
+            assert json.loads((Path(tmp_dir) / "export.json").read_text(encoding="utf-8")) == records
+            with open(Path(tmp_dir) / "export.csv", newline="", encoding="utf-8") as sink:
+                assert len(list(csv.DictReader(sink))) == len(records)
+        with pytest.raises(ValueError, match="not registered"):
+            basic_example.export_all(records, ["json", "html"], sink_factory)
+        assert not (Path(tmp_dir) / "export.html").exists()
+
+
+def test_lazy_exporter_stays_registered_until_it_imports() -> None:
+    basic_example.register_lazy_exporter("test-lazy", "missing_exporter_module:export", "text/x-test-lazy")
+    try:
+        for _ in range(2):  # a failed import leaves the format registered for a retry
+            with pytest.raises(ModuleNotFoundError):
+                basic_example.export_data({"a": 1}, "text/x-test-lazy")
+            assert "test-lazy" in basic_example.exporter_formats()
+        basic_example._lazy_exporters["test-lazy"] = "pdf_exporter:export_to_pdf"
+        assert basic_example.export_data({"a": 1}, "test-lazy") == "PDF Document\n\na: 1\n"
+        assert "test-lazy" in basic_example.exporters
+        assert "test-lazy" not in basic_example._lazy_exporters
+    finally:
+        basic_example.exporters.pop("test-lazy", None)
+        basic_example._lazy_exporters.pop("test-lazy", None)
+        basic_example.mime_types.pop("text/x-test-lazy", None)
+
+
+def test_export_data_dispatches_by_name_and_mime_type() -> None:
+    data = {"name": "John Doe", "age": 30}
+    assert basic_example.export_data(data, "csv") == "name,John Doe\nage,30"
+    assert json.loads(basic_example.export_data(data, "application/json")) == data
+    assert basic_example.resolve_exporter("application/yaml") is basic_example.export_to_yaml
+    assert basic_example.export_data(data, "application/pdf").startswith("PDF Document")
+    with pytest.raises(ValueError, match="not registered"):
+        basic_example.export_data(data, "html")
+
+
+if __name__ == "__main__":
+    test_error_policy_rejects_duplicates()
+    test_override_policy_replaces_earlier_command()
+    test_namespace_policy_prefixes_the_package()
+    test_resolve_name_follows_policy()
+    test_lazy_listing_and_lookup_of_namespaced_commands()
+    test_manifest_reads_decorators_statically()
+    test_manifest_imports_modules_it_cannot_read()
+    test_manifest_lists_the_bundled_commands()
+    test_peer_uid_comes_from_the_kernel()
+    test_run_batch_keeps_input_order()
+    test_stream_exporters_write_every_record()
+    test_stream_exporters_resolve_mime_types()
+    test_export_all_in_a_process_pool()
+    test_lazy_exporter_stays_registered_until_it_imports()
+    test_export_data_dispatches_by_name_and_mime_type()
+    test_batch_runs_commands_without_a_batch_handler()
+    test_batch_cli_with_options_before_the_command()
+    test_daemon_runs_commands_and_refuses_a_second_start()
+    test_cached_discovery_skips_importlib_metadata()
+    # print("All tests passed.")
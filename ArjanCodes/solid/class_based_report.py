@@ -1,26 +1,289 @@
+import contextlib
+import glob
+import importlib.util
 import json
-from dataclasses import dataclass
+import os
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Protocol
+from itertools import repeat
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Protocol, runtime_checkable
+import numpy as np
 import pandas as pd
 
+from date_index import load_date_index
+
 
 @dataclass
 class ReportConfig:
-    input_file: str
+    input_file: str  # a file, a directory of them, or a glob such as "sales/*.csv"
     output_file: str
     start_date: datetime | None = None
     end_date: datetime | None = None
 
 
+PARQUET_SUFFIXES = (".parquet", ".pq")
+DATA_SUFFIXES = (".csv", *PARQUET_SUFFIXES)
+
+
+def input_files(input_file: str) -> list[str]:
+    """The files a config's `input_file` stands for, in a stable order."""
+    path = Path(input_file)
+    if path.is_file():
+        # Checked first: a file name may itself contain "[", "*" or "?".
+        return [input_file]
+    if path.is_dir():
+        files = sorted(str(child) for child in path.iterdir() if child.suffix.lower() in DATA_SUFFIXES)
+    elif any(char in input_file for char in "*?["):
+        files = sorted(glob.glob(input_file, recursive=True))
+    else:
+        return [input_file]
+    if not files:
+        raise FileNotFoundError(f"No sales files match '{input_file}'.")
+    return files
+
+
+# Date-based groups for `period_configs` and `SalesReportGenerator.generate_grouped`.
+PERIODS = {"day": "D", "month": "M", "quarter": "Q", "year": "Y"}
+
+
+def period_configs(
+    input_file: str, output_file: str, start_date: datetime, end_date: datetime, period: str = "month"
+) -> list[ReportConfig]:
+    """One config per day, month, quarter or year between the dates, clipped to them.
+
+    `output_file` is formatted with the period, e.g. "sales_report_{period}.json"
+    gives "sales_report_2023-01.json" or "sales_report_2023Q1.json".
+    """
+    configs = []
+    for each in pd.period_range(start_date, end_date, freq=PERIODS[period]):
+        configs.append(ReportConfig(
+            input_file=input_file,
+            output_file=output_file.format(period=each),
+            start_date=max(each.start_time.to_pydatetime(), start_date),
+            end_date=min(each.end_time.normalize().to_pydatetime(), end_date),
+        ))
+    return configs
+
+
 # ---- Reader ----
 class SalesReader(Protocol):
     def read(self, input_file: str) -> pd.DataFrame: ...
 
 
+@runtime_checkable
+class RangeSalesReader(Protocol):
+    """A reader that can skip data outside the report's date range."""
+
+    def read_range(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame: ...
+
+
+@runtime_checkable
+class ChunkedSalesReader(Protocol):
+    """A reader that yields the rows in a date range a bounded chunk at a time."""
+
+    def read_chunks(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None, chunksize: int
+    ) -> Iterator[pd.DataFrame]: ...
+
+
+# Rows per chunk when a CSV is filtered or aggregated while reading.
+CSV_CHUNK_ROWS = 500_000
+# Upper bound on the files one worker aggregates per task.
+MAX_FILES_PER_TASK = 64
+
+
+def _dtypes(columns: list[str] | None) -> dict[str, str]:
+    # Customer names repeat a lot; categorical codes are smaller and hash faster.
+    return {"name": "category"} if columns is None or "name" in columns else {}
+
+
+def _concat_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame | None:
+    frames = list(chunks)
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    if "name" in df.columns:
+        # Chunks have different categories, which concat turns into objects.
+        df["name"] = df["name"].astype("category")
+    return df
+
+
 class CSVSalesReader:
+    def __init__(self, columns: list[str] | None = None) -> None:
+        self.columns = columns  # None reads every column
+
+    def _read_csv(self, source: str | IO[bytes], **kwargs: object) -> pd.DataFrame:
+        return pd.read_csv(
+            source, usecols=self.columns, parse_dates=["date"], dtype=_dtypes(self.columns), **kwargs
+        )
+
+    def read(self, input_file: str) -> pd.DataFrame:
+        return self._read_csv(input_file)
+
+    def read_range(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame:
+        if start_date is None and end_date is None:
+            return self.read(input_file)
+        index = load_date_index(input_file)
+        if index is not None:
+            # The slice holds little more than the range, so it is read in one go.
+            with index.open_slice(start_date, end_date) as source:
+                return DateRangeFilter().apply(self._read_csv(source), start_date, end_date)
+        # Without an index, chunks filtered as they arrive never hold the rows
+        # outside the range.
+        df = _concat_chunks(self.read_chunks(input_file, start_date, end_date, CSV_CHUNK_ROWS))
+        return df if df is not None else self._read_csv(input_file, nrows=0)
+
+    def read_chunks(
+        self,
+        input_file: str,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        chunksize: int = CSV_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        # With a date index (see date_index.build_date_index) only the blocks
+        # that overlap the range are read from disk at all. Without one every
+        # row is still parsed, but rows outside the range are dropped per
+        # chunk, so memory follows the chunk size instead of the file.
+        index = load_date_index(input_file)
+        date_filter = DateRangeFilter()
+        with contextlib.ExitStack() as stack:
+            source: str | IO[bytes] = input_file
+            if index is not None:
+                source = stack.enter_context(index.open_slice(start_date, end_date))
+            for chunk in stack.enter_context(self._read_csv(source, chunksize=chunksize)):
+                yield date_filter.apply(chunk, start_date, end_date)
+
+
+class ArrowCSVSalesReader(CSVSalesReader):
+    def _read_csv(self, source: str | IO[bytes], **kwargs: object) -> pd.DataFrame:
+        if "chunksize" in kwargs:
+            # The pyarrow engine cannot read in chunks; the C parser can.
+            return super()._read_csv(source, **kwargs)
+        # Arrow parses ISO dates itself; `parse_dates` would make pandas
+        # re-parse them from Python date objects, which is several times slower.
+        return pd.read_csv(
+            source,
+            engine="pyarrow",
+            usecols=self.columns,
+            dtype={**_dtypes(self.columns), "date": "datetime64[ns]"},
+            **kwargs,
+        )
+
+    def read_range(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame:
+        # Arrow parses the whole slice in parallel, which beats chunking it;
+        # the range is applied right after.
+        index = load_date_index(input_file)
+        if index is None:
+            df = self.read(input_file)
+        else:
+            with index.open_slice(start_date, end_date) as source:
+                df = self._read_csv(source)
+        return DateRangeFilter().apply(df, start_date, end_date)
+
+
+class ParquetSalesReader:
+    def __init__(self, columns: list[str] | None = None) -> None:
+        self.columns = columns
+
+    def read(self, input_file: str) -> pd.DataFrame:
+        return self._read_parquet(input_file)
+
+    def read_range(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame:
+        # pyarrow skips whole row groups whose date statistics miss the range.
+        return self._read_parquet(input_file, filters=self._filters(start_date, end_date))
+
+    def read_chunks(
+        self,
+        input_file: str,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        chunksize: int = CSV_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        filters = self._filters(start_date, end_date)
+        batches = ds.dataset(input_file, format="parquet").to_batches(
+            columns=self.columns,
+            filter=pq.filters_to_expression(filters) if filters else None,
+            batch_size=chunksize,
+        )
+        for batch in batches:
+            yield self._categorize(batch.to_pandas())
+
+    def _filters(
+        self, start_date: datetime | None, end_date: datetime | None
+    ) -> list[tuple[str, str, pd.Timestamp]] | None:
+        filters = []
+        if start_date:
+            filters.append(("date", ">=", pd.Timestamp(start_date)))
+        if end_date:
+            filters.append(("date", "<=", pd.Timestamp(end_date)))
+        return filters or None
+
+    def _read_parquet(self, input_file: str, **kwargs: object) -> pd.DataFrame:
+        return self._categorize(pd.read_parquet(input_file, columns=self.columns, **kwargs))
+
+    def _categorize(self, df: pd.DataFrame) -> pd.DataFrame:
+        if "name" in df.columns:
+            df["name"] = df["name"].astype("category")
+        return df
+
+
+class PerFileSalesReader:
+    """Reads each file with the reader for its extension.
+
+    For a directory or glob that mixes CSV and Parquet files.
+    """
+
+    def __init__(self, csv_reader: CSVSalesReader, parquet_reader: ParquetSalesReader) -> None:
+        self.csv_reader = csv_reader
+        self.parquet_reader = parquet_reader
+
     def read(self, input_file: str) -> pd.DataFrame:
-        return pd.read_csv(input_file, parse_dates=["date"])
+        return self._reader(input_file).read(input_file)
+
+    def read_range(
+        self, input_file: str, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame:
+        return self._reader(input_file).read_range(input_file, start_date, end_date)
+
+    def read_chunks(
+        self,
+        input_file: str,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        chunksize: int = CSV_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        return self._reader(input_file).read_chunks(input_file, start_date, end_date, chunksize)
+
+    def _reader(self, input_file: str) -> CSVSalesReader | ParquetSalesReader:
+        is_parquet = Path(input_file).suffix.lower() in PARQUET_SUFFIXES
+        return self.parquet_reader if is_parquet else self.csv_reader
+
+
+def select_reader(input_file: str, columns: list[str] | None = None) -> SalesReader:
+    """Pick a reader from the file extensions, preferring the Arrow CSV parser."""
+    suffixes = {Path(path).suffix.lower() for path in input_files(input_file)}
+    if importlib.util.find_spec("pyarrow") is not None:
+        csv_reader = ArrowCSVSalesReader(columns)
+    else:
+        csv_reader = CSVSalesReader(columns)
+    if suffixes.isdisjoint(PARQUET_SUFFIXES):
+        return csv_reader
+    if suffixes.issubset(PARQUET_SUFFIXES):
+        return ParquetSalesReader(columns)
+    return PerFileSalesReader(csv_reader, ParquetSalesReader(columns))
 
 
 # ---- Filters ----
@@ -32,54 +295,362 @@ class DateRangeFilter:
             df = df[df["date"] <= pd.Timestamp(end_date)]
         return df
 
+    def apply_sorted(
+        self, df: pd.DataFrame, start_date: datetime | None, end_date: datetime | None
+    ) -> pd.DataFrame:
+        """Same rows as `apply` for a frame sorted by date, cut out by binary search."""
+        if not start_date and not end_date:
+            return df
+        dates = df["date"].to_numpy()
+        # Missing dates sort last and never fall inside a bound.
+        not_a_time = np.datetime64("NaT", np.datetime_data(dates.dtype)[0])
+        begin, end = 0, int(np.searchsorted(dates, not_a_time))
+        if start_date:
+            begin = int(np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), "left"))
+        if end_date:
+            end = int(np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), "right"))
+        return df.iloc[begin:max(begin, end)]
+
+
+# ---- Aggregates ----
+# What a metric can ask for; each is a SalesAggregate field.
+AGGREGATIONS = ("rows", "total", "positive_total", "positive_count", "return_count", "customers")
+# Largest groups x customers table `SalesAggregate.by_group` allocates (one byte each).
+PAIR_TABLE_MAX_SIZE = 1 << 26
+
+
+def _distinct_names(names: pd.Series) -> set[str]:
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        # Mark the codes that occur; -1 (missing) lands in the spare last slot.
+        seen = np.zeros(len(names.cat.categories) + 1, dtype=bool)
+        seen[names.cat.codes.to_numpy()] = True
+        return set(names.cat.categories[seen[:-1]].tolist())
+    return set(pd.unique(names.dropna()).tolist())
+
+
+def _distinct_names_by_group(names: pd.Series, groups: np.ndarray, group_count: int) -> list[set[str]]:
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        codes, categories = names.cat.codes.to_numpy(), names.cat.categories
+    else:
+        codes, categories = pd.factorize(names)
+    if not len(categories):
+        return [set() for _ in range(group_count)]
+    present = codes >= 0
+    pair_ids = groups[present].astype(np.int64) * len(categories) + codes[present]
+    # Every distinct (group, name) pair once, ordered by group. Marking them
+    # in a table is much cheaper than sorting when the table is small enough.
+    if group_count * len(categories) <= PAIR_TABLE_MAX_SIZE:
+        seen = np.zeros(group_count * len(categories), dtype=bool)
+        seen[pair_ids] = True
+        pairs = np.flatnonzero(seen)
+    else:
+        pairs = np.unique(pair_ids)
+    bounds = np.searchsorted(pairs // len(categories), np.arange(1, group_count))
+    values = np.asarray(categories)
+    return [set(values[chunk % len(categories)].tolist()) for chunk in np.split(pairs, bounds)]
+
+
+@dataclass
+class SalesAggregate:
+    """Everything the metrics need from a set of rows, mergeable across chunks.
+
+    Customers are kept as an exact set of names, so memory grows with the
+    number of distinct customers rather than with the number of rows.
+    """
+
+    rows: int = 0
+    total: float = 0.0
+    positive_total: float = 0.0
+    positive_count: int = 0
+    return_count: int = 0
+    customers: set[str] = field(default_factory=set)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, aggregations: Iterable[str] = AGGREGATIONS) -> "SalesAggregate":
+        """Compute only the requested aggregations, straight on the NumPy arrays.
+
+        Each runs once no matter how many metrics use it, and none of them
+        builds a masked copy of `price`. Missing prices are skipped, as
+        pandas does.
+        """
+        needed = set(aggregations)
+        aggregate = cls(rows=len(df))
+        if needed & {"total", "positive_total", "positive_count", "return_count"}:
+            price = df["price"].to_numpy(dtype=np.float64)
+            if "total" in needed:
+                total = price.sum()
+                aggregate.total = float(np.nansum(price) if np.isnan(total) else total)
+            if "positive_total" in needed:
+                # fmax turns NaN and negatives into 0, which add nothing.
+                aggregate.positive_total = float(np.fmax(price, 0.0).sum())
+            if "positive_count" in needed:
+                aggregate.positive_count = int(np.count_nonzero(price > 0))
+            if "return_count" in needed:
+                aggregate.return_count = int(np.count_nonzero(price < 0))
+        if "customers" in needed:
+            aggregate.customers = _distinct_names(df["name"])
+        return aggregate
+
+    @classmethod
+    def by_group(
+        cls, df: pd.DataFrame, keys: pd.Series, aggregations: Iterable[str] = AGGREGATIONS
+    ) -> dict[str, "SalesAggregate"]:
+        """One aggregate per distinct key, all from the same vectorized pass.
+
+        Rows are bucketed by their key's code and every aggregation becomes a
+        `bincount`. Rows with a missing key are left out.
+        """
+        groups, labels = pd.factorize(keys, sort=True)
+        present = groups >= 0
+        if not present.all():
+            df, groups = df[present], groups[present]
+        group_count = len(labels)
+        needed = set(aggregations)
+        aggregates = [cls(rows=rows) for rows in np.bincount(groups, minlength=group_count).tolist()]
+
+        columns: dict[str, np.ndarray] = {}
+        if needed & {"total", "positive_total", "positive_count", "return_count"}:
+            price = df["price"].to_numpy(dtype=np.float64)
+            if "total" in needed:
+                columns["total"] = np.bincount(groups, weights=np.nan_to_num(price), minlength=group_count)
+            if "positive_total" in needed:
+                columns["positive_total"] = np.bincount(
+                    groups, weights=np.fmax(price, 0.0), minlength=group_count
+                )
+            if "positive_count" in needed:
+                columns["positive_count"] = np.bincount(groups[price > 0], minlength=group_count)
+            if "return_count" in needed:
+                columns["return_count"] = np.bincount(groups[price < 0], minlength=group_count)
+        for name, values in columns.items():
+            for aggregate, value in zip(aggregates, values.tolist()):
+                setattr(aggregate, name, value)
+        if "customers" in needed:
+            customers = _distinct_names_by_group(df["name"], groups, group_count)
+            for aggregate, names in zip(aggregates, customers):
+                aggregate.customers = names
+        return {str(label): aggregate for label, aggregate in zip(labels, aggregates)}
+
+    def merge(self, other: "SalesAggregate") -> "SalesAggregate":
+        self.rows += other.rows
+        self.total += other.total
+        self.positive_total += other.positive_total
+        self.positive_count += other.positive_count
+        self.return_count += other.return_count
+        self.customers |= other.customers
+        return self
+
 
 # ---- Metrics ----
 class Metric(Protocol):
+    columns: tuple[str, ...]
+    aggregations: tuple[str, ...]
+
     def compute(self, df: pd.DataFrame) -> dict[str, object]: ...
 
+    def finalize(self, aggregate: SalesAggregate) -> dict[str, object]: ...
+
+
+def required_columns(metrics: Iterable[Metric], extra: Iterable[str] = ()) -> list[str]:
+    """Columns to read: `date` for the filter, whatever the metrics use, and `extra`."""
+    columns = ["date"]
+    columns.extend(column for column in extra if column not in columns)
+    for metric in metrics:
+        columns.extend(column for column in metric.columns if column not in columns)
+    return columns
+
+
+def plan_aggregations(metrics: Iterable[Metric]) -> set[str]:
+    """The aggregations to compute so every metric can be finalized from one pass."""
+    return {aggregation for metric in metrics for aggregation in metric.aggregations}
+
 
 class CustomerCountMetric:
+    columns = ("name",)
+    aggregations = ("customers",)
+
     def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        return {"number_of_customers": int(df["name"].nunique())}
+        return self.finalize(SalesAggregate.from_frame(df, self.aggregations))
+
+    def finalize(self, aggregate: SalesAggregate) -> dict[str, object]:
+        return {"number_of_customers": len(aggregate.customers)}
 
 
 class AverageOrderValueMetric:
+    columns = ("price",)
+    aggregations = ("positive_total", "positive_count")
+
     def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        positive = df.loc[df["price"] > 0, "price"]
-        avg = positive.mean() if not positive.empty else 0.0
+        return self.finalize(SalesAggregate.from_frame(df, self.aggregations))
+
+    def finalize(self, aggregate: SalesAggregate) -> dict[str, object]:
+        count = aggregate.positive_count
+        avg = aggregate.positive_total / count if count else 0.0
         return {"average_order_value (pre-tax)": round(avg, 2)}
 
 
 class ReturnPercentageMetric:
+    columns = ("price",)
+    aggregations = ("rows", "return_count")
+
     def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        pct = (df["price"] < 0).mean() * 100 if not df.empty else 0.0
+        return self.finalize(SalesAggregate.from_frame(df, self.aggregations))
+
+    def finalize(self, aggregate: SalesAggregate) -> dict[str, object]:
+        pct = aggregate.return_count / aggregate.rows * 100 if aggregate.rows else 0.0
         return {"percentage_of_returns": round(pct, 2)}
 
 
 class TotalSalesMetric:
+    columns = ("price",)
+    aggregations = ("total",)
+
     def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        total = df["price"].sum()
-        return {"total_sales_in_period (pre-tax)": round(total, 2)}
+        return self.finalize(SalesAggregate.from_frame(df, self.aggregations))
+
+    def finalize(self, aggregate: SalesAggregate) -> dict[str, object]:
+        return {"total_sales_in_period (pre-tax)": round(aggregate.total, 2)}
 
 
 # ---- Report Generator ----
 class SalesReportGenerator:
-    def __init__(self, reader: SalesReader, date_filter: DateRangeFilter, metrics: list[Metric]) -> None:
+    """Runs the metrics over the sales data in a config's date range.
+
+    The metrics declare the aggregations they need, which are computed in
+    a single pass into a SalesAggregate that every metric is finalized from.
+    With `chunksize` set the reader must be a ChunkedSalesReader: the data is
+    never held in memory at once and each chunk is folded into the aggregate.
+
+    An input made of several files is aggregated file by file; with an
+    `executor` (a ProcessPoolExecutor to use every core) batches of files
+    are aggregated in parallel and the partial aggregates merged.
+    """
+
+    def __init__(
+        self,
+        reader: SalesReader,
+        date_filter: DateRangeFilter,
+        metrics: list[Metric],
+        chunksize: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
         self.reader = reader
         self.date_filter = date_filter
         self.metrics = metrics
+        self.chunksize = chunksize
+        self.executor = executor
 
-    def generate_report(self, config: ReportConfig) -> dict[str, object]:
-        df = self.reader.read(config.input_file)
-        df = self.date_filter.apply(df, config.start_date, config.end_date)
+    def __getstate__(self) -> dict[str, object]:
+        # Sent to worker processes without the executor itself.
+        return {**self.__dict__, "executor": None}
 
-        report_data = {
+    def generate_report(self, config: ReportConfig) -> dict[str, object]:
+        return self._report(config, self.aggregate(config))
+
+    def generate_reports(self, configs: list[ReportConfig]) -> list[dict[str, object]]:
+        """One report per config, all from a single read of their input file.
+
+        The rows spanning every config's range are read once (in chunks with
+        `chunksize`) and sorted by date; each range is then cut out by binary
+        search, so overlapping months, quarters and years cost one read.
+        """
+        sources = {config.input_file for config in configs}
+        if len(sources) > 1:
+            raise ValueError(f"generate_reports needs configs for one input file, got {sorted(sources)}.")
+        if not configs:
+            return []
+        starts = [config.start_date for config in configs]
+        ends = [config.end_date for config in configs]
+        span = ReportConfig(
+            input_file=configs[0].input_file,
+            output_file="",
+            start_date=None if None in starts else min(starts),
+            end_date=None if None in ends else max(ends),
+        )
+
+        aggregations = plan_aggregations(self.metrics)
+        aggregates = [SalesAggregate() for _ in configs]
+        for frame in self._frames(span):
+            frame = frame.sort_values("date", kind="stable", ignore_index=True)
+            for config, aggregate in zip(configs, aggregates):
+                rows = self.date_filter.apply_sorted(frame, config.start_date, config.end_date)
+                aggregate.merge(SalesAggregate.from_frame(rows, aggregations))
+        return [self._report(config, aggregate) for config, aggregate in zip(configs, aggregates)]
+
+    def generate_grouped(self, config: ReportConfig, by: str) -> dict[str, dict[str, object]]:
+        """One report per group of the rows in the config's range, by group key.
+
+        `by` is "day", "month", "quarter" or "year", or a column such as "item",
+        which the reader must then read (see `required_columns`).
+        """
+        aggregations = plan_aggregations(self.metrics)
+        aggregates: dict[str, SalesAggregate] = {}
+        for frame in self._frames(config):
+            keys = frame["date"].dt.to_period(PERIODS[by]) if by in PERIODS else frame[by]
+            for key, aggregate in SalesAggregate.by_group(frame, keys, aggregations).items():
+                if key in aggregates:
+                    aggregates[key].merge(aggregate)
+                else:
+                    aggregates[key] = aggregate
+        return {key: self._report(config, aggregates[key], group=key) for key in sorted(aggregates)}
+
+    def aggregate(self, config: ReportConfig) -> SalesAggregate:
+        files = input_files(config.input_file)
+        if self.executor is None or len(files) < 2:
+            return self._aggregate_files(config, files)
+
+        # Several files per task keeps the per-task overhead small when
+        # there are thousands of them, while leaving enough tasks to balance.
+        per_task = max(1, min(MAX_FILES_PER_TASK, len(files) // (4 * (os.cpu_count() or 1))))
+        batches = [files[i:i + per_task] for i in range(0, len(files), per_task)]
+        aggregate = SalesAggregate()
+        for partial in self.executor.map(self._aggregate_files, repeat(config), batches):
+            aggregate.merge(partial)
+        return aggregate
+
+    def read(self, config: ReportConfig) -> pd.DataFrame:
+        """The rows of a single input file in the config's date range, all in memory."""
+        if isinstance(self.reader, RangeSalesReader):
+            df = self.reader.read_range(config.input_file, config.start_date, config.end_date)
+        else:
+            df = self.reader.read(config.input_file)
+        return self.date_filter.apply(df, config.start_date, config.end_date)
+
+    def _aggregate_files(self, config: ReportConfig, files: list[str]) -> SalesAggregate:
+        aggregations = plan_aggregations(self.metrics)
+        aggregate = SalesAggregate()
+        for input_file in files:
+            for frame in self._file_frames(replace(config, input_file=input_file)):
+                aggregate.merge(SalesAggregate.from_frame(frame, aggregations))
+        return aggregate
+
+    def _frames(self, config: ReportConfig) -> Iterator[pd.DataFrame]:
+        for input_file in input_files(config.input_file):
+            yield from self._file_frames(replace(config, input_file=input_file))
+
+    def _file_frames(self, config: ReportConfig) -> Iterator[pd.DataFrame]:
+        # The rows in the config's range: all at once, or a chunk at a time.
+        if self.chunksize is None:
+            yield self.read(config)
+            return
+        if not isinstance(self.reader, ChunkedSalesReader):
+            raise TypeError(f"{type(self.reader).__name__} cannot read in chunks.")
+        chunks = self.reader.read_chunks(
+            config.input_file, config.start_date, config.end_date, self.chunksize
+        )
+        for chunk in chunks:
+            yield self.date_filter.apply(chunk, config.start_date, config.end_date)
+
+    def _report(
+        self, config: ReportConfig, aggregate: SalesAggregate, group: str | None = None
+    ) -> dict[str, object]:
+        report_data: dict[str, object] = {
             "report_start": config.start_date.strftime("%Y-%m-%d") if config.start_date else "N/A",
             "report_end": config.end_date.strftime("%Y-%m-%d") if config.end_date else "N/A",
         }
-
+        if group is not None:
+            report_data["group"] = group
         for metric in self.metrics:
-            report_data.update(metric.compute(df))
+            report_data.update(metric.finalize(aggregate))
         return report_data
 
 
@@ -99,7 +670,6 @@ def main() -> None:
         end_date=datetime(2023, 12, 31),
     )
 
-    reader = CSVSalesReader()
     date_filter = DateRangeFilter()
     metrics = [
         CustomerCountMetric(),
@@ -107,6 +677,7 @@ def main() -> None:
         ReturnPercentageMetric(),
         TotalSalesMetric(),
     ]
+    reader = select_reader(config.input_file, required_columns(metrics))
 
     generator = SalesReportGenerator(reader, date_filter, metrics)
     report = generator.generate_report(config)
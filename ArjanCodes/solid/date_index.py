@@ -0,0 +1,148 @@
+import bisect
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".dateidx.json"
+INDEX_BLOCK_ROWS = 10_000
+
+
+@dataclass
+class DateIndex:
+    """Byte offsets of every `block_rows`-th row of a CSV file sorted by date.
+
+    Stored next to the CSV as `<file>.dateidx.json`. It assumes one record per
+    line (no newlines inside quoted fields), which holds for the sales files.
+    """
+
+    input_file: str
+    size: int
+    mtime_ns: int
+    header_end: int
+    dates: list[pd.Timestamp]
+    offsets: list[int]
+
+    def byte_range(self, start_date: datetime | None, end_date: datetime | None) -> tuple[int, int]:
+        """Smallest [begin, end) byte range that holds every row in the date range."""
+        begin_block = 0
+        if start_date is not None:
+            # The block before the first one starting at `start_date` may still
+            # end with rows from that day.
+            begin_block = max(bisect.bisect_left(self.dates, pd.Timestamp(start_date)) - 1, 0)
+        end = self.size
+        if end_date is not None:
+            end_block = bisect.bisect_right(self.dates, pd.Timestamp(end_date))
+            if end_block < len(self.offsets):
+                end = self.offsets[end_block]
+        begin = self.offsets[begin_block] if self.offsets else self.header_end
+        return begin, max(begin, end)
+
+    def open_slice(self, start_date: datetime | None, end_date: datetime | None) -> io.BufferedReader:
+        """The header plus only the blocks that can hold rows in the date range.
+
+        The bytes are read from disk as the caller consumes them, so a wide
+        range can still be parsed in chunks.
+        """
+        begin, end = self.byte_range(start_date, end_date)
+        return io.BufferedReader(_SliceReader(self.input_file, self.header_end, begin, end))
+
+
+def open_csv_slice(input_file: str, begin: int, end: int) -> io.BufferedReader:
+    """The CSV header plus the rows in bytes [begin, end), which must start and end on lines."""
+    with open(input_file, "rb") as f:
+        header_end = len(f.readline())
+    return io.BufferedReader(_SliceReader(input_file, header_end, max(begin, header_end), end))
+
+
+class _SliceReader(io.RawIOBase):
+    """File-like view of `input_file[:header_end] + input_file[begin:end]`."""
+
+    def __init__(self, input_file: str, header_end: int, begin: int, end: int) -> None:
+        self._file = open(input_file, "rb")
+        self._pending = self._file.read(header_end)
+        self._file.seek(begin)
+        self._remaining = end - begin
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        if self._pending:
+            size = min(len(buffer), len(self._pending))
+            buffer[:size] = self._pending[:size]
+            self._pending = self._pending[size:]
+            return size
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def index_path(input_file: str) -> str:
+    return f"{input_file}{INDEX_SUFFIX}"
+
+
+def build_date_index(input_file: str, block_rows: int = INDEX_BLOCK_ROWS) -> DateIndex:
+    """Write the date index of a CSV file; raises ValueError if it is not sorted by date."""
+    stat = os.stat(input_file)
+    dates: list[str] = []
+    offsets: list[int] = []
+    with open(input_file, "rb") as f:
+        header = f.readline()
+        date_column = next(csv.reader([header.decode("utf-8")])).index("date")
+        header_end = offset = len(header)
+        previous = ""
+        for row_number, line in enumerate(f):
+            date = next(csv.reader([line.decode("utf-8")]))[date_column]
+            if date < previous:
+                raise ValueError(f"{input_file} is not sorted by date (row {row_number + 1}).")
+            if row_number % block_rows == 0:
+                dates.append(date)
+                offsets.append(offset)
+            previous = date
+            offset += len(line)
+
+    with open(index_path(input_file), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "header_end": header_end,
+            "dates": dates,
+            "offsets": offsets,
+        }, f)
+    return load_date_index(input_file)
+
+
+def load_date_index(input_file: str) -> DateIndex | None:
+    """The index for `input_file`, or None if there is none or the file changed since."""
+    try:
+        with open(index_path(input_file), encoding="utf-8") as f:
+            data = json.load(f)
+        stat = os.stat(input_file)
+    except (OSError, ValueError):
+        return None
+    if (
+        data.get("version") != INDEX_VERSION
+        or data["size"] != stat.st_size
+        or data["mtime_ns"] != stat.st_mtime_ns
+    ):
+        return None
+    return DateIndex(
+        input_file=input_file,
+        size=data["size"],
+        mtime_ns=data["mtime_ns"],
+        header_end=data["header_end"],
+        dates=[pd.Timestamp(date) for date in data["dates"]],
+        offsets=data["offsets"],
+    )
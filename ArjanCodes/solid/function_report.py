@@ -1,12 +1,24 @@
+import contextlib
 import json
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable
+from typing import IO, Any, Callable, Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
+from date_index import load_date_index
+
 
 type MetricFunc = Callable[[pd.DataFrame], dict[str, Any]]
+type AggregateMetricFunc = Callable[["SalesAggregate"], dict[str, Any]]
+
+# The only columns the bundled metrics use; `address`, `item` and `tax` are skipped.
+SALES_COLUMNS = ["name", "price", "date"]
+# Rows parsed at a time when only a date range of the file is needed.
+CHUNK_ROWS = 500_000
+# What an aggregate metric can ask for; each is a SalesAggregate field.
+AGGREGATIONS = ("rows", "total", "positive_total", "positive_count", "return_count", "customers")
 
 
 @dataclass
@@ -16,10 +28,83 @@ class ReportConfig:
     start_date: datetime | None = None
     end_date: datetime | None = None
     metrics: list[MetricFunc] = field(default_factory=list)
+    # Aggregate the file this many rows at a time instead of loading it whole.
+    chunksize: int | None = None
+
+
+@dataclass
+class SalesAggregate:
+    """What the metrics need from a set of rows; chunks merge with `merge_aggregates`."""
+
+    rows: int = 0
+    total: float = 0.0
+    positive_total: float = 0.0
+    positive_count: int = 0
+    return_count: int = 0
+    customers: set[str] = field(default_factory=set)
+
+
+def sales_dtype(columns: list[str] | None) -> dict[str, str]:
+    return {"name": "category"} if columns is None or "name" in columns else {}
+
+
+def read_sales_data(
+    input_file: str | IO[bytes], columns: list[str] | None = SALES_COLUMNS, nrows: int | None = None
+) -> pd.DataFrame:
+    return pd.read_csv(input_file, usecols=columns, parse_dates=["date"], dtype=sales_dtype(columns), nrows=nrows)
+
+
+def read_sales_chunks(
+    input_file: str,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    columns: list[str] | None = SALES_COLUMNS,
+    chunksize: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows between `start_date` and `end_date`, `chunksize` rows at a time.
 
+    With a date index next to the file (see `date_index.build_date_index`)
+    only the blocks overlapping the range are read; otherwise every row is
+    parsed and the ones outside the range are dropped per chunk.
+    """
+    index = load_date_index(input_file)
+    with contextlib.ExitStack() as stack:
+        source: str | IO[bytes] = input_file
+        if index is not None:
+            source = stack.enter_context(index.open_slice(start_date, end_date))
+        chunks = stack.enter_context(pd.read_csv(
+            source, usecols=columns, parse_dates=["date"], dtype=sales_dtype(columns), chunksize=chunksize
+        ))
+        for chunk in chunks:
+            yield filter_by_date_range(chunk, start_date, end_date)
 
-def read_sales_data(input_file: str) -> pd.DataFrame:
-    return pd.read_csv(input_file, parse_dates=["date"])
+
+def read_sales_range(
+    input_file: str,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    columns: list[str] | None = SALES_COLUMNS,
+) -> pd.DataFrame:
+    """Read only the rows between `start_date` and `end_date`.
+
+    With no range the file is read in one go. With a date index only its
+    slice is read, also in one go. Otherwise the file is read in chunks that
+    are filtered as they arrive, so rows outside the range are never held.
+    """
+    if start_date is None and end_date is None:
+        return read_sales_data(input_file, columns)
+    index = load_date_index(input_file)
+    if index is not None:
+        with index.open_slice(start_date, end_date) as source:
+            return filter_by_date_range(read_sales_data(source, columns), start_date, end_date)
+    frames = list(read_sales_chunks(input_file, start_date, end_date, columns))
+    if not frames:
+        return read_sales_data(input_file, columns, nrows=0)
+    df = pd.concat(frames, ignore_index=True)
+    if "name" in df.columns:
+        # Chunks have different categories, which concat turns into objects.
+        df["name"] = df["name"].astype("category")
+    return df
 
 
 def filter_by_date_range(
@@ -53,13 +138,139 @@ def compute_total_sales(df: pd.DataFrame) -> dict[str, Any]:
     return {"total_sales_in_period (pre-tax)": round(total, 2)}
 
 
+def distinct_names(names: pd.Series) -> set[str]:
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        # Mark the codes that occur; -1 (missing) lands in the spare last slot.
+        seen = np.zeros(len(names.cat.categories) + 1, dtype=bool)
+        seen[names.cat.codes.to_numpy()] = True
+        return set(names.cat.categories[seen[:-1]].tolist())
+    return set(pd.unique(names.dropna()).tolist())
+
+
+def aggregate_sales(df: pd.DataFrame, aggregations: Iterable[str] = AGGREGATIONS) -> SalesAggregate:
+    """Compute only the requested aggregations, straight on the NumPy arrays.
+
+    Each runs once however many metrics need it, without masked copies of
+    `price`. Missing prices are skipped, as pandas does.
+    """
+    needed = set(aggregations)
+    aggregate = SalesAggregate(rows=len(df))
+    if needed & {"total", "positive_total", "positive_count", "return_count"}:
+        price = df["price"].to_numpy(dtype=np.float64)
+        if "total" in needed:
+            total = price.sum()
+            aggregate.total = float(np.nansum(price) if np.isnan(total) else total)
+        if "positive_total" in needed:
+            # fmax turns NaN and negatives into 0, which add nothing.
+            aggregate.positive_total = float(np.fmax(price, 0.0).sum())
+        if "positive_count" in needed:
+            aggregate.positive_count = int(np.count_nonzero(price > 0))
+        if "return_count" in needed:
+            aggregate.return_count = int(np.count_nonzero(price < 0))
+    if "customers" in needed:
+        aggregate.customers = distinct_names(df["name"])
+    return aggregate
+
+
+def merge_aggregates(a: SalesAggregate, b: SalesAggregate) -> SalesAggregate:
+    return SalesAggregate(
+        rows=a.rows + b.rows,
+        total=a.total + b.total,
+        positive_total=a.positive_total + b.positive_total,
+        positive_count=a.positive_count + b.positive_count,
+        return_count=a.return_count + b.return_count,
+        customers=a.customers | b.customers,
+    )
+
+
+def customer_count_from_aggregate(aggregate: SalesAggregate) -> dict[str, Any]:
+    return {"number_of_customers": len(aggregate.customers)}
+
+
+def average_order_value_from_aggregate(aggregate: SalesAggregate) -> dict[str, Any]:
+    count = aggregate.positive_count
+    avg = aggregate.positive_total / count if count else 0.0
+    return {"average_order_value (pre-tax)": round(avg, 2)}
+
+
+def return_percentage_from_aggregate(aggregate: SalesAggregate) -> dict[str, Any]:
+    pct = aggregate.return_count / aggregate.rows * 100 if aggregate.rows else 0.0
+    return {"percentage_of_returns": round(pct, 2)}
+
+
+def total_sales_from_aggregate(aggregate: SalesAggregate) -> dict[str, Any]:
+    return {"total_sales_in_period (pre-tax)": round(aggregate.total, 2)}
+
+
+@dataclass(frozen=True)
+class AggregateMetric:
+    finalize: AggregateMetricFunc
+    aggregations: tuple[str, ...]
+
+
+# The metrics that can be computed from a SalesAggregate, and what they need.
+AGGREGATE_METRICS: dict[MetricFunc, AggregateMetric] = {
+    compute_customer_count: AggregateMetric(customer_count_from_aggregate, ("customers",)),
+    compute_average_order_value: AggregateMetric(
+        average_order_value_from_aggregate, ("positive_total", "positive_count")
+    ),
+    compute_return_percentage: AggregateMetric(return_percentage_from_aggregate, ("rows", "return_count")),
+    compute_total_sales: AggregateMetric(total_sales_from_aggregate, ("total",)),
+}
+
+
+def plan_aggregations(metrics: Iterable[MetricFunc]) -> set[str]:
+    """The aggregations to compute so every aggregate metric comes from one pass."""
+    return {
+        aggregation
+        for metric in metrics
+        if metric in AGGREGATE_METRICS
+        for aggregation in AGGREGATE_METRICS[metric].aggregations
+    }
+
+
+def report_columns(metrics: Iterable[MetricFunc]) -> list[str] | None:
+    """The columns to read: only SALES_COLUMNS if every metric is a bundled one.
+
+    Any other metric may use any column, so then the whole file is read.
+    """
+    return SALES_COLUMNS if all(metric in AGGREGATE_METRICS for metric in metrics) else None
+
+
+def aggregate_sales_chunks(
+    config: ReportConfig, aggregations: Iterable[str] = AGGREGATIONS
+) -> SalesAggregate:
+    """Fold the file into one SalesAggregate without holding more than a chunk."""
+    aggregate = SalesAggregate()
+    chunks = read_sales_chunks(
+        config.input_file, config.start_date, config.end_date, chunksize=config.chunksize or CHUNK_ROWS
+    )
+    for chunk in chunks:
+        aggregate = merge_aggregates(aggregate, aggregate_sales(chunk, aggregations))
+    return aggregate
+
+
 def generate_report_data(config: ReportConfig) -> dict[str, Any]:
-    df = read_sales_data(config.input_file)
-    df = filter_by_date_range(df, config.start_date, config.end_date)
+    aggregations = plan_aggregations(config.metrics)
+    df: pd.DataFrame | None = None
+    if config.chunksize is not None:
+        missing = [metric.__name__ for metric in config.metrics if metric not in AGGREGATE_METRICS]
+        if missing:
+            raise ValueError(f"Metrics without an aggregate form cannot be chunked: {missing}")
+        aggregate = aggregate_sales_chunks(config, aggregations)
+    else:
+        df = read_sales_range(
+            config.input_file, config.start_date, config.end_date, report_columns(config.metrics)
+        )
+        aggregate = aggregate_sales(df, aggregations)
 
+    # Aggregate metrics share the single pass above; any others get the rows.
     report_data: dict[str, Any] = {}
     for metric in config.metrics:
-        report_data.update(metric(df))
+        if metric in AGGREGATE_METRICS:
+            report_data.update(AGGREGATE_METRICS[metric].finalize(aggregate))
+        else:
+            report_data.update(metric(df))
 
     report_data["report_start"] = (
         config.start_date.strftime("%Y-%m-%d") if config.start_date else "N/A"
@@ -0,0 +1,280 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from class_based_report import (
+    CSV_CHUNK_ROWS,
+    CSVSalesReader,
+    DateRangeFilter,
+    Metric,
+    ReportConfig,
+    SalesAggregate,
+    SalesReportGenerator,
+)
+from date_index import open_csv_slice
+
+STORE_VERSION = 2
+STORE_SUFFIX = ".aggregates.sqlite"
+STORE_COLUMNS = ["name", "price", "date"]
+# How a day's customer ids are stored: sorted little-endian uint32s.
+CUSTOMER_ID_DTYPE = np.dtype("<u4")
+# Bytes at the start of the file, and just before the processed offset, that
+# must be unchanged for the stored aggregates to still describe the file.
+FINGERPRINT_BYTES = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS customers (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    total REAL NOT NULL,
+    positive_total REAL NOT NULL,
+    positive_count INTEGER NOT NULL,
+    return_count INTEGER NOT NULL,
+    customers BLOB NOT NULL  -- sorted customer ids, see CUSTOMER_ID_DTYPE
+) WITHOUT ROWID;
+CREATE TEMP TABLE IF NOT EXISTS chunk_names (name TEXT PRIMARY KEY) WITHOUT ROWID;
+"""
+
+
+def store_path(input_file: str) -> str:
+    return f"{input_file}{STORE_SUFFIX}"
+
+
+class IncrementalSalesStore:
+    """Per-day partial aggregates of an append-only sales CSV, kept in SQLite.
+
+    `update` only parses the bytes appended since the last run. Each day
+    stores the SalesAggregate sums and counts plus the sorted ids of its
+    customers, so any date range is answered by summing rows and merging
+    the ids; a day costs four bytes per customer seen that day.
+    Dates are whole days, as in the sales files. If the processed part of
+    the file changes (it was rewritten rather than appended to), the store
+    starts over. Updates take SQLite's write lock before reading where the
+    last one stopped, so concurrent processes never fold the same rows twice.
+
+    Only rows ending in a newline are stored, since the last one may still
+    be being written. With `partial_last_line` (the default) `aggregate`
+    still counts a final row without a newline, parsed from the file on each
+    call, so reports match a full read; the next update re-reads it.
+    """
+
+    def __init__(self, input_file: str, store_file: str | None = None, partial_last_line: bool = True) -> None:
+        self.input_file = input_file
+        self.store_file = store_file or store_path(input_file)
+        self.partial_last_line = partial_last_line
+        # Autocommit mode: transactions are begun explicitly, see `update`.
+        self._db = sqlite3.connect(self.store_file, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._names: list[str | None] | None = None
+
+    def __enter__(self) -> "IncrementalSalesStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    @property
+    def offset(self) -> int:
+        """Bytes of the input file already folded into the store."""
+        return int(self._meta("offset") or 0)
+
+    def update(self, chunksize: int = CSV_CHUNK_ROWS) -> int:
+        """Fold the rows appended since the last update in; returns how many."""
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            size = os.stat(self.input_file).st_size
+            offset = self.offset
+            if self._meta("version") != STORE_VERSION or offset > size or (
+                self._meta("fingerprint") != self._fingerprint(offset)
+            ):
+                self._reset()
+                offset = 0
+            end = self._last_line_end(offset, size)
+            if end <= offset:
+                return 0
+
+            rows = 0
+            source = open_csv_slice(self.input_file, offset, end)
+            with source, pd.read_csv(
+                source,
+                usecols=STORE_COLUMNS,
+                parse_dates=["date"],
+                dtype={"name": "category"},
+                chunksize=chunksize,
+            ) as chunks:
+                for chunk in chunks:
+                    self._add(SalesAggregate.by_group(chunk, chunk["date"].dt.to_period("D")))
+                    rows += len(chunk)
+            self._set_meta(offset=end, fingerprint=self._fingerprint(end))
+        return rows
+
+    def aggregate(
+        self, start_date: datetime | None = None, end_date: datetime | None = None
+    ) -> SalesAggregate:
+        """Merge the stored days in the range, which includes both ends."""
+        with self._db:
+            self._db.execute("BEGIN")  # one snapshot for every query below
+            aggregate = self._stored_aggregate(start_date, end_date)
+            offset = self.offset
+        if self.partial_last_line:
+            tail = self._tail(offset)
+            if tail is not None:
+                aggregate.merge(SalesAggregate.from_frame(DateRangeFilter().apply(tail, start_date, end_date)))
+        return aggregate
+
+    def _stored_aggregate(self, start_date: datetime | None, end_date: datetime | None) -> SalesAggregate:
+        conditions, params = [], []
+        if start_date:
+            # A start time after midnight excludes that day's (midnight) rows.
+            start = pd.Timestamp(start_date)
+            first_day = start.normalize() + timedelta(days=1) if start != start.normalize() else start
+            conditions.append("day >= ?")
+            params.append(first_day.strftime("%Y-%m-%d"))
+        if end_date:
+            conditions.append("day <= ?")
+            params.append(pd.Timestamp(end_date).strftime("%Y-%m-%d"))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows, total, positive_total, positive_count, return_count = self._db.execute(
+            "SELECT COALESCE(SUM(rows), 0), COALESCE(SUM(total), 0.0), COALESCE(SUM(positive_total), 0.0),"
+            f" COALESCE(SUM(positive_count), 0), COALESCE(SUM(return_count), 0) FROM days {where}",
+            params,
+        ).fetchone()
+        days = [
+            np.frombuffer(customers, dtype=CUSTOMER_ID_DTYPE)
+            for (customers,) in self._db.execute(f"SELECT customers FROM days {where}", params)
+        ]
+        names = self._customer_names()
+        customer_ids = np.unique(np.concatenate(days)) if days else np.zeros(0, dtype=CUSTOMER_ID_DTYPE)
+        return SalesAggregate(
+            rows=rows,
+            total=total,
+            positive_total=positive_total,
+            positive_count=positive_count,
+            return_count=return_count,
+            customers={names[customer_id] for customer_id in customer_ids.tolist()},
+        )
+
+    def _add(self, days: dict[str, SalesAggregate]) -> None:
+        ids = self._customer_ids(set().union(*(aggregate.customers for aggregate in days.values())))
+        stored = {
+            row[0]: row
+            for row in self._db.execute(
+                f"SELECT * FROM days WHERE day IN ({', '.join('?' * len(days))})", list(days)
+            )
+        }
+        for day, aggregate in days.items():
+            members = np.unique(np.array([ids[name] for name in aggregate.customers], dtype=CUSTOMER_ID_DTYPE))
+            values = [
+                aggregate.rows,
+                aggregate.total,
+                aggregate.positive_total,
+                aggregate.positive_count,
+                aggregate.return_count,
+            ]
+            if day in stored:
+                previous = stored[day]
+                values = [old + new for old, new in zip(previous[1:6], values)]
+                members = np.union1d(np.frombuffer(previous[6], dtype=CUSTOMER_ID_DTYPE), members)
+            self._db.execute(
+                "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (day, *values, members.astype(CUSTOMER_ID_DTYPE).tobytes()),
+            )
+
+    def _customer_ids(self, names: set[str]) -> dict[str, int]:
+        # Only the chunk's names are looked up, through a temporary table,
+        # so a chunk costs the same however many customers are stored.
+        self._db.execute("DELETE FROM chunk_names")
+        self._db.executemany("INSERT INTO chunk_names VALUES (?)", ((name,) for name in names))
+        self._db.execute("INSERT OR IGNORE INTO customers (name) SELECT name FROM chunk_names")
+        self._names = None
+        return dict(self._db.execute("SELECT name, id FROM customers JOIN chunk_names USING (name)"))
+
+    def _customer_names(self) -> list[str | None]:
+        # Indexed by customer id; ids are dense, so this is a plain list.
+        if self._names is None:
+            rows = self._db.execute("SELECT id, name FROM customers").fetchall()
+            self._names = [None] * (max((customer_id for customer_id, _ in rows), default=0) + 1)
+            for customer_id, name in rows:
+                self._names[customer_id] = name
+        return self._names
+
+    def _tail(self, offset: int) -> pd.DataFrame | None:
+        # The bytes after the stored rows: normally nothing, or a last row
+        # without its newline. One still being written may not parse yet.
+        size = os.stat(self.input_file).st_size
+        if size <= offset:
+            return None
+        try:
+            with open_csv_slice(self.input_file, offset, size) as source:
+                tail = pd.read_csv(source, usecols=STORE_COLUMNS, parse_dates=["date"])
+        except ValueError:
+            return None
+        parsed = pd.api.types.is_datetime64_any_dtype(tail["date"]) and pd.api.types.is_numeric_dtype(tail["price"])
+        return tail if parsed else None
+
+    def _last_line_end(self, offset: int, size: int) -> int:
+        # A row still being written has no newline yet; leave it for next time.
+        with open(self.input_file, "rb") as f:
+            end = size
+            while end > offset:
+                begin = max(offset, end - FINGERPRINT_BYTES)
+                f.seek(begin)
+                newline = f.read(end - begin).rfind(b"\n")
+                if newline >= 0:
+                    return begin + newline + 1
+                end = begin
+        return offset
+
+    def _fingerprint(self, offset: int) -> str:
+        digest = hashlib.sha256(str(offset).encode())
+        with open(self.input_file, "rb") as f:
+            digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+            f.seek(max(0, offset - FINGERPRINT_BYTES))
+            digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        return digest.hexdigest()
+
+    def _reset(self) -> None:
+        self._db.execute("DELETE FROM days")
+        self._db.execute("DELETE FROM customers")
+        self._db.execute("DELETE FROM meta")
+        self._names = None
+        self._set_meta(version=STORE_VERSION, offset=0, fingerprint=self._fingerprint(0))
+
+    def _meta(self, key: str) -> object:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, **values: object) -> None:
+        self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", values.items())
+
+
+class IncrementalSalesReportGenerator(SalesReportGenerator):
+    """A SalesReportGenerator that answers `generate_report` from the store.
+
+    Every report first folds in whatever was appended to the input file,
+    then merges the stored days of its range. The store holds the columns
+    the built-in metrics need, so custom metrics must finalize from the
+    same SalesAggregate fields. `partial_last_line` is passed to the store.
+    """
+
+    def __init__(
+        self, metrics: list[Metric], store_file: str | None = None, partial_last_line: bool = True
+    ) -> None:
+        super().__init__(CSVSalesReader(), DateRangeFilter(), metrics)
+        self.store_file = store_file
+        self.partial_last_line = partial_last_line
+
+    def aggregate(self, config: ReportConfig) -> SalesAggregate:
+        with IncrementalSalesStore(config.input_file, self.store_file, self.partial_last_line) as store:
+            store.update()
+            return store.aggregate(config.start_date, config.end_date)
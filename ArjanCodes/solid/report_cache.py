@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterable, Protocol
+
+import numpy as np
+
+from class_based_report import input_files
+
+DEFAULT_MAX_SIZE = 128
+HASH_BLOCK_SIZE = 1 << 20
+
+
+class CacheableConfig(Protocol):
+    # Both generators' ReportConfig fit this.
+    input_file: str
+    start_date: Any
+    end_date: Any
+
+
+Report = dict[str, Any]
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_local(qualname: str) -> bool:
+    # Lambdas and closures share their qualname with every other instance.
+    return "<lambda>" in qualname or "<locals>" in qualname
+
+
+def _json_report(report: Report) -> Report | None:
+    """The report with NumPy scalars as plain numbers, or None if JSON cannot hold it.
+
+    Anything else would come back from the disk cache as a different type.
+    """
+    native: Report = {}
+    for key, value in report.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if not isinstance(value, JSON_SCALARS):
+            return None
+        native[key] = value
+    return native
+
+
+def _metric_id(metric: object) -> object:
+    # Metric functions by name; metric objects by class and settings. Local
+    # functions and classes are keyed by the object itself, which keeps them
+    # alive (so their id cannot be reused) and out of the disk cache.
+    if hasattr(metric, "__qualname__"):
+        if _is_local(metric.__qualname__):
+            return metric
+        return f"{metric.__module__}.{metric.__qualname__}"
+    cls = type(metric)
+    settings = getattr(metric, "__dict__", {})
+    if _is_local(cls.__qualname__):
+        return cls, repr(sorted(settings.items()))
+    return f"{cls.__module__}.{cls.__qualname__}{sorted(settings.items()) if settings else ''}"
+
+
+class ReportCache:
+    """Finished reports keyed by what they were computed from.
+
+    The key is the input's content (size plus a hash of every file it names),
+    the date range and the metrics. Hashing reads the file, so hashes are
+    memoized by path, size and mtime: a hit only costs a `stat` per file,
+    and any write to the input changes its mtime and so its key. Entries
+    are kept in memory up to `max_size`, least recently used first out,
+    and in `cache_dir` as JSON when one is given, which lets other processes
+    (and reruns after a `touch`) reuse them. Reports using lambdas or locally
+    defined metrics, or holding values other than strings and numbers, are
+    only cached in memory.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, cache_dir: str | Path | None = None) -> None:
+        self.max_size = max_size
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._reports: OrderedDict[tuple, Report] = OrderedDict()
+        # Absolute path -> (size, mtime_ns, digest); one entry per file.
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self.stats: dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def wrap(
+        self, generate: Callable[[Any], Report], metrics: Iterable[object] | None = None
+    ) -> Callable[[Any], Report]:
+        """Cache a report function: `generate_report_data`, or a generator's `generate_report`.
+
+        Functional configs carry their metrics; for SalesReportGenerator pass
+        `metrics=generator.metrics`.
+        """
+
+        @wraps(generate)
+        def cached(config: Any) -> Report:
+            config_metrics = metrics if metrics is not None else getattr(config, "metrics", ())
+            return self.get_or_compute(config, config_metrics, lambda: generate(config))
+
+        return cached
+
+    def get_or_compute(
+        self, config: CacheableConfig, metrics: Iterable[object], compute: Callable[[], Report]
+    ) -> Report:
+        key = self.key(config, metrics)
+        report = self._reports.get(key)
+        if report is not None:
+            self._reports.move_to_end(key)
+            self.stats["hits"] += 1
+            return dict(report)
+
+        persistent = all(isinstance(metric_id, str) for metric_id in key[3])
+        report = self._load(key) if persistent else None
+        if report is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            report = compute()
+            if persistent:
+                self._store(key, report)
+        self._reports[key] = report
+        if len(self._reports) > self.max_size:
+            self._reports.popitem(last=False)
+        return dict(report)
+
+    def key(self, config: CacheableConfig, metrics: Iterable[object]) -> tuple:
+        return (
+            tuple(self._fingerprint(input_file) for input_file in input_files(config.input_file)),
+            config.start_date.isoformat() if config.start_date else None,
+            config.end_date.isoformat() if config.end_date else None,
+            tuple(_metric_id(metric) for metric in metrics),
+        )
+
+    def clear(self) -> None:
+        self._reports.clear()
+        self._hashes.clear()
+
+    def _fingerprint(self, input_file: str) -> tuple[int, str]:
+        stat = os.stat(input_file)
+        path = os.path.abspath(input_file)
+        memo = self._hashes.get(path)
+        if memo is not None and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+            return stat.st_size, memo[2]
+        blake = hashlib.blake2b(digest_size=16)
+        with open(input_file, "rb") as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                blake.update(block)
+        # Replaces the digest of the file's previous version.
+        self._hashes[path] = (stat.st_size, stat.st_mtime_ns, blake.hexdigest())
+        return stat.st_size, self._hashes[path][2]
+
+    def _path(self, key: tuple) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{hashlib.sha256(repr(key).encode()).hexdigest()}.json"
+
+    def _load(self, key: tuple) -> Report | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: tuple, report: Report) -> None:
+        path = self._path(key)
+        native = _json_report(report)
+        if path is None or native is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(native, ensure_ascii=False), encoding="utf-8")
+            os.replace(temporary, path)
+        except OSError:
+            pass  # The in-memory entry still works; it just is not shared.
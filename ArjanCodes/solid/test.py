@@ -0,0 +1,394 @@
+import glob
+import os
+import random
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import function_report
+from class_based_report import (
+    ArrowCSVSalesReader,
+    AverageOrderValueMetric,
+    CSVSalesReader,
+    CustomerCountMetric,
+    DateRangeFilter,
+    ParquetSalesReader,
+    ReportConfig,
+    ReturnPercentageMetric,
+    SalesAggregate,
+    SalesReportGenerator,
+    TotalSalesMetric,
+    period_configs,
+    plan_aggregations,
+    required_columns,
+    select_reader,
+)
+from date_index import build_date_index
+from incremental_report import IncrementalSalesReportGenerator, IncrementalSalesStore, store_path
+from report_cache import ReportCache
+
+# Every faster path is checked against the original one-frame metric
+# functions run on a generated data set, read whole and filtered with pandas.
+ROWS: int = 3000
+CHUNK_ROWS: int = 97
+INDEX_BLOCK_ROWS: int = 64
+RANGES: list[tuple[datetime | None, datetime | None]] = [
+    (None, None),
+    (datetime(2023, 1, 1), datetime(2023, 12, 31)),
+    (datetime(2022, 3, 15, 12), datetime(2022, 3, 20)),  # starts after midnight
+    (datetime(2030, 1, 1), None),  # no rows
+]
+REFERENCE_METRICS = [
+    function_report.compute_customer_count,
+    function_report.compute_average_order_value,
+    function_report.compute_return_percentage,
+    function_report.compute_total_sales,
+]
+
+
+def count_sales(df: pd.DataFrame) -> dict[str, object]:
+    return {"sales": (df["price"] > 0).sum()}  # a NumPy integer
+
+
+def first_sale(df: pd.DataFrame) -> dict[str, object]:
+    return {"first_sale": df["date"].min()}  # a Timestamp, which JSON cannot hold
+
+
+def metrics() -> list:
+    return [CustomerCountMetric(), AverageOrderValueMetric(), ReturnPercentageMetric(), TotalSalesMetric()]
+
+
+def make_sales(rng: random.Random, rows: int = ROWS) -> pd.DataFrame:
+    """Sales sorted by date, like the real files: a few rows per day, some returns."""
+    names = [f"Customer {i}" for i in range(60)]
+    start = datetime(2022, 1, 1).toordinal()
+    days = sorted(rng.randrange(start, start + 3 * 365) for _ in range(rows))
+    return pd.DataFrame({
+        "name": [rng.choice(names) for _ in range(rows)],
+        "address": [f"{rng.randint(1, 999)} Road, Town" for _ in range(rows)],
+        "item": [rng.choice(["Desk", "Chair", "Keyboard"]) for _ in range(rows)],
+        "date": pd.to_datetime([datetime.fromordinal(day) for day in days]),
+        "price": [round(rng.uniform(-200, 1000), 2) for _ in range(rows)],
+        "tax": [round(rng.uniform(0, 50), 2) for _ in range(rows)],
+    })
+
+
+def write_csv(df: pd.DataFrame, path: Path) -> str:
+    df.to_csv(path, index=False, date_format="%Y-%m-%d")
+    return str(path)
+
+
+def reference(df: pd.DataFrame, start_date: datetime | None, end_date: datetime | None) -> dict[str, object]:
+    if start_date:
+        df = df[df["date"] >= pd.Timestamp(start_date)]
+    if end_date:
+        df = df[df["date"] <= pd.Timestamp(end_date)]
+    report: dict[str, object] = {
+        "report_start": start_date.strftime("%Y-%m-%d") if start_date else "N/A",
+        "report_end": end_date.strftime("%Y-%m-%d") if end_date else "N/A",
+    }
+    for metric in REFERENCE_METRICS:
+        report.update(metric(df))
+    return report
+
+
+def assert_same_report(actual: dict[str, object], expected: dict[str, object]) -> None:
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == value, key
+
+
+def config_for(input_file: str, start_date: datetime | None, end_date: datetime | None) -> ReportConfig:
+    return ReportConfig(input_file=input_file, output_file="", start_date=start_date, end_date=end_date)
+
+
+def test_readers_match_reference() -> None:
+    pytest.importorskip("pyarrow")
+    df = make_sales(random.Random(1))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        indexed_file = write_csv(df, Path(tmp_dir) / "indexed.csv")
+        build_date_index(indexed_file, block_rows=INDEX_BLOCK_ROWS)
+        parquet_file = str(Path(tmp_dir) / "sales.parquet")
+        df.to_parquet(parquet_file, row_group_size=500)
+
+        columns = required_columns(metrics())
+        sources = [
+            (CSVSalesReader(columns), csv_file),
+            (CSVSalesReader(columns), indexed_file),
+            (ArrowCSVSalesReader(columns), csv_file),
+            (ArrowCSVSalesReader(columns), indexed_file),
+            (ParquetSalesReader(columns), parquet_file),
+        ]
+        for reader, input_file in sources:
+            for chunksize in (None, CHUNK_ROWS):
+                generator = SalesReportGenerator(reader, DateRangeFilter(), metrics(), chunksize=chunksize)
+                for start_date, end_date in RANGES:
+                    report = generator.generate_report(config_for(input_file, start_date, end_date))
+                    assert_same_report(report, reference(df, start_date, end_date))
+
+
+def test_function_report_matches_reference() -> None:
+    df = make_sales(random.Random(2))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        for indexed in (False, True):
+            if indexed:
+                build_date_index(csv_file, block_rows=INDEX_BLOCK_ROWS)
+            for chunksize in (None, CHUNK_ROWS):
+                for start_date, end_date in RANGES:
+                    config = function_report.ReportConfig(
+                        csv_file, "", start_date, end_date, list(REFERENCE_METRICS), chunksize
+                    )
+                    report = function_report.generate_report_data(config)
+                    assert_same_report(report, reference(df, start_date, end_date))
+
+
+def test_function_report_reads_the_columns_custom_metrics_use() -> None:
+    df = make_sales(random.Random(8))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        config = function_report.ReportConfig(
+            csv_file, "", metrics=[function_report.compute_total_sales, lambda df: {"items": df["item"].nunique()}]
+        )
+        report = function_report.generate_report_data(config)
+        assert report["items"] == df["item"].nunique()
+        assert report["total_sales_in_period (pre-tax)"] == reference(df, None, None)["total_sales_in_period (pre-tax)"]
+
+
+def test_chunked_report_rejects_row_metrics() -> None:
+    config = function_report.ReportConfig(
+        "sales_data.csv", "", metrics=[lambda df: {"rows": len(df)}], chunksize=CHUNK_ROWS
+    )
+    with pytest.raises(ValueError, match="cannot be chunked"):
+        function_report.generate_report_data(config)
+
+
+def test_fused_metrics_match_the_row_metrics() -> None:
+    df = make_sales(random.Random(9))
+    # Missing prices and names are skipped, as the pandas reductions skip them.
+    df.loc[::7, "price"] = float("nan")
+    df.loc[::11, "name"] = None
+    df["name"] = df["name"].astype("category")
+    expected = reference(df, None, None)
+    del expected["report_start"], expected["report_end"]
+    for frame in (df, df.astype({"name": object})):
+        report: dict[str, object] = {}
+        for metric in metrics():
+            report.update(metric.compute(frame))
+        assert report == expected
+        aggregate = function_report.aggregate_sales(frame)
+        report = {}
+        for metric in REFERENCE_METRICS:
+            report.update(function_report.AGGREGATE_METRICS[metric].finalize(aggregate))
+        assert report == expected
+
+
+def test_plan_aggregations_computes_only_what_the_metrics_need() -> None:
+    assert plan_aggregations([CustomerCountMetric(), TotalSalesMetric()]) == {"customers", "total"}
+    assert function_report.plan_aggregations(
+        [function_report.compute_average_order_value, lambda df: {}]
+    ) == {"positive_total", "positive_count"}
+    aggregate = SalesAggregate.from_frame(make_sales(random.Random(10)), {"total"})
+    assert aggregate.total != 0.0 and aggregate.customers == set() and aggregate.return_count == 0
+
+
+def test_generate_reports_and_grouped_match_reference() -> None:
+    pytest.importorskip("pyarrow")
+    df = make_sales(random.Random(3))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        start_date, end_date = datetime(2022, 2, 10), datetime(2023, 5, 20)
+        for chunksize in (None, CHUNK_ROWS):
+            generator = SalesReportGenerator(
+                select_reader(csv_file, required_columns(metrics(), extra=["item"])),
+                DateRangeFilter(),
+                metrics(),
+                chunksize=chunksize,
+            )
+            for period in ("month", "quarter", "year"):
+                configs = period_configs(csv_file, "", start_date, end_date, period)
+                for config, report in zip(configs, generator.generate_reports(configs)):
+                    assert_same_report(report, reference(df, config.start_date, config.end_date))
+
+            config = config_for(csv_file, start_date, end_date)
+            in_range = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
+            grouped = generator.generate_grouped(config, "month")
+            assert list(grouped) == sorted(grouped)
+            for month, report in grouped.items():
+                month_rows = in_range[in_range["date"].dt.to_period("M") == month]
+                expected = {**reference(month_rows, start_date, end_date), "group": month}
+                assert_same_report(report, expected)
+            by_item = generator.generate_grouped(config, "item")
+            assert sorted(by_item) == sorted(in_range["item"].unique())
+            for item, report in by_item.items():
+                expected = {**reference(in_range[in_range["item"] == item], start_date, end_date), "group": item}
+                assert_same_report(report, expected)
+
+
+def test_multiple_files_match_one_file() -> None:
+    pytest.importorskip("pyarrow")
+    df = make_sales(random.Random(4))
+    parts = np.array_split(np.arange(len(df)), 4)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sales_dir = Path(tmp_dir) / "sales [2022-2024]"
+        sales_dir.mkdir()
+        for number, rows in enumerate(parts):
+            part = df.iloc[rows]
+            if number % 2:
+                part.to_parquet(sales_dir / f"part{number}.parquet")
+            else:
+                write_csv(part, sales_dir / f"part{number}.csv")
+        reader = select_reader(str(sales_dir), required_columns(metrics()))
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            for executor in (None, pool):
+                generator = SalesReportGenerator(reader, DateRangeFilter(), metrics(), executor=executor)
+                for start_date, end_date in RANGES:
+                    report = generator.generate_report(config_for(str(sales_dir), start_date, end_date))
+                    assert_same_report(report, reference(df, start_date, end_date))
+
+        # The directory name holds glob metacharacters, which must be escaped.
+        glob_config = config_for(os.path.join(glob.escape(str(sales_dir)), "*.csv"), None, None)
+        csv_rows = df.iloc[np.concatenate(parts[::2])]
+        report = SalesReportGenerator(CSVSalesReader(), DateRangeFilter(), metrics()).generate_report(glob_config)
+        assert_same_report(report, reference(csv_rows, None, None))
+
+
+def test_report_cache() -> None:
+    df = make_sales(random.Random(5))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        cache_dir = Path(tmp_dir) / "cache"
+        cache = ReportCache(cache_dir=cache_dir)
+        generate = cache.wrap(function_report.generate_report_data)
+        config = function_report.ReportConfig(csv_file, "", metrics=list(REFERENCE_METRICS))
+
+        first = generate(config)
+        assert generate(config) == first
+        assert cache.stats == {"hits": 1, "disk_hits": 0, "misses": 1}
+        assert ReportCache(cache_dir=cache_dir).wrap(function_report.generate_report_data)(config) == first
+
+        # Same content with a new mtime is still a hit; new content is not.
+        os.utime(csv_file, ns=(0, os.stat(csv_file).st_mtime_ns + 10**9))
+        generate(config)
+        assert cache.stats["hits"] == 2
+        write_csv(df.iloc[:-1], Path(csv_file))
+        assert_same_report(generate(config), reference(df.iloc[:-1], None, None))
+        assert cache.stats["misses"] == 2
+        assert len(cache._hashes) == 1
+
+        # Lambdas share a qualname, so they are kept apart and off the disk.
+        stored = set(cache_dir.iterdir())
+        first_lambda = generate(function_report.ReportConfig(csv_file, "", metrics=[lambda df: {"value": 1}]))
+        second_lambda = generate(function_report.ReportConfig(csv_file, "", metrics=[lambda df: {"value": 2}]))
+        assert (first_lambda["value"], second_lambda["value"]) == (1, 2)
+        assert set(cache_dir.iterdir()) == stored
+
+
+def test_report_cache_disk_hits_keep_their_types() -> None:
+    df = make_sales(random.Random(12))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        cache_dir = Path(tmp_dir) / "cache"
+        config = function_report.ReportConfig(csv_file, "", metrics=[count_sales, first_sale])
+        first = ReportCache(cache_dir=cache_dir).wrap(function_report.generate_report_data)(config)
+        numbers = function_report.ReportConfig(csv_file, "", metrics=[count_sales])
+        ReportCache(cache_dir=cache_dir).wrap(function_report.generate_report_data)(numbers)
+
+        # NumPy numbers are stored as plain numbers; a Timestamp is not stored at all.
+        cache = ReportCache(cache_dir=cache_dir)
+        generate = cache.wrap(function_report.generate_report_data)
+        assert generate(numbers)["sales"] == (df["price"] > 0).sum()
+        assert type(generate(numbers)["sales"]) is int
+        assert generate(config) == first
+        assert cache.stats == {"hits": 1, "disk_hits": 1, "misses": 1}
+
+
+def test_incremental_store_matches_reference() -> None:
+    df = make_sales(random.Random(6))
+    # Split inside a day, so the second update merges into a stored day.
+    split = next(i for i in range(len(df) // 2, len(df)) if df["date"].iloc[i] == df["date"].iloc[i - 1])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df.iloc[:split], Path(tmp_dir) / "sales.csv")
+        with IncrementalSalesStore(csv_file) as store:
+            assert store.update() == split
+            df.iloc[split:].to_csv(csv_file, mode="a", header=False, index=False, date_format="%Y-%m-%d")
+            assert store.update() == len(df) - split
+            assert store.update() == 0
+
+        generator = IncrementalSalesReportGenerator(metrics())
+        for start_date, end_date in RANGES:
+            report = generator.generate_report(config_for(csv_file, start_date, end_date))
+            assert_same_report(report, reference(df, start_date, end_date))
+
+        # A rewritten file is detected and the store starts over.
+        rewritten = df.assign(price=df["price"] * 2)
+        write_csv(rewritten, Path(csv_file))
+        for start_date, end_date in RANGES:
+            report = generator.generate_report(config_for(csv_file, start_date, end_date))
+            assert_same_report(report, reference(rewritten, start_date, end_date))
+
+
+def test_incremental_store_keeps_each_days_customers() -> None:
+    df = make_sales(random.Random(11))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        with IncrementalSalesStore(csv_file) as store:
+            store.update(chunksize=CHUNK_ROWS)
+        db = sqlite3.connect(store_path(csv_file))
+        with db:
+            stored = dict(db.execute("SELECT day, length(customers) FROM days"))
+            # A store written by an older version is rebuilt on the next update.
+            db.execute("UPDATE meta SET value = 1 WHERE key = 'version'")
+        db.close()
+        customers_per_day = df.groupby(df["date"].dt.strftime("%Y-%m-%d"))["name"].nunique()
+        assert stored == {day: 4 * count for day, count in customers_per_day.items()}
+        with IncrementalSalesStore(csv_file) as store:
+            assert store.update() == len(df)
+
+
+def test_incremental_store_partial_last_line() -> None:
+    df = make_sales(random.Random(7))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = write_csv(df, Path(tmp_dir) / "sales.csv")
+        with open(csv_file, "rb+") as f:
+            f.truncate(os.stat(csv_file).st_size - 1)  # drop the final newline
+
+        with IncrementalSalesStore(csv_file) as store:
+            assert store.update() == len(df) - 1
+        report = IncrementalSalesReportGenerator(metrics()).generate_report(config_for(csv_file, None, None))
+        assert_same_report(report, reference(df, None, None))
+        without_last = IncrementalSalesReportGenerator(metrics(), partial_last_line=False)
+        report = without_last.generate_report(config_for(csv_file, None, None))
+        assert_same_report(report, reference(df.iloc[:-1], None, None))
+
+        # Once its newline arrives the row is stored, and counted once.
+        with open(csv_file, "a") as f:
+            f.write("\n")
+        with IncrementalSalesStore(csv_file) as store:
+            assert store.update() == 1
+        report = IncrementalSalesReportGenerator(metrics()).generate_report(config_for(csv_file, None, None))
+        assert_same_report(report, reference(df, None, None))
+
+
+if __name__ == "__main__":
+    test_readers_match_reference()
+    test_function_report_matches_reference()
+    test_function_report_reads_the_columns_custom_metrics_use()
+    test_chunked_report_rejects_row_metrics()
+    test_fused_metrics_match_the_row_metrics()
+    test_plan_aggregations_computes_only_what_the_metrics_need()
+    test_generate_reports_and_grouped_match_reference()
+    test_multiple_files_match_one_file()
+    test_report_cache()
+    test_report_cache_disk_hits_keep_their_types()
+    test_incremental_store_matches_reference()
+    test_incremental_store_keeps_each_days_customers()
+    test_incremental_store_partial_last_line()
+    # print("All tests passed.")
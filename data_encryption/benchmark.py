@@ -0,0 +1,181 @@
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from bellaso_cipher import BellasoCipher
+from ceasar_cipher import CeasarCipher
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by the crack benchmarks
+    np = None
+
+ALPHABETS: dict[str, str] = {
+    "letters": string.ascii_letters,
+    "ascii": string.ascii_letters + string.digits + " ,.!?\n",
+    "unicode": string.ascii_letters + " ,.!?\n" + "éüßÇÑ日本語",
+}
+DEFAULT_SIZES: tuple[int, ...] = (1_000, 100_000, 1_000_000)
+DEFAULT_KEY_LENGTHS: tuple[int, ...] = (1, 7, 64)
+# The reference character loop is too slow to time on the largest inputs.
+LOOP_MAX_SIZE: int = 100_000
+
+Record = dict[str, Any]
+
+
+def make_text(size: int, alphabet: str = ALPHABETS["ascii"], seed: int = 0) -> str:
+    rng: random.Random = random.Random(seed)
+    return "".join(rng.choices(alphabet, k=size))
+
+
+def make_key(length: int, seed: int = 0) -> str:
+    rng: random.Random = random.Random(seed)
+    return "".join(rng.choices(string.ascii_uppercase, k=length))
+
+
+def make_english(size: int, seed: int = 0) -> str:
+    # Letters drawn with English frequencies, good enough for frequency analysis.
+    from crack import ENGLISH_FREQUENCIES
+
+    rng: random.Random = random.Random(seed)
+    alphabet: list[str] = list(string.ascii_lowercase) + [" "]
+    weights: list[float] = [float(f) for f in ENGLISH_FREQUENCIES] + [0.2]
+    return "".join(rng.choices(alphabet, weights=weights, k=size))
+
+
+def bench(func: Callable[[], object], repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def cipher_cases(
+    text: str, key_lengths: tuple[int, ...]
+) -> list[tuple[str, int | None, str, str, Callable[[], object]]]:
+    """(cipher, key_length, engine, operation, call) for every timed variant."""
+    cases: list[tuple[str, int | None, str, str, Callable[[], object]]] = []
+    ceasar: CeasarCipher = CeasarCipher(shift=3)
+    cases.append(("ceasar", None, "table", "encrypt", lambda: ceasar.encrypt(text)))
+    cases.append(("ceasar", None, "table", "decrypt", lambda: ceasar.decrypt(text)))
+    if len(text) <= LOOP_MAX_SIZE:
+        cases.append(("ceasar", None, "loop", "encrypt", lambda: ceasar._encrypt(text, ceasar.shift)))
+
+    for key_length in key_lengths:
+        bellaso: BellasoCipher = BellasoCipher(key=make_key(key_length))
+        cases.append(("bellaso", key_length, "table", "encrypt", lambda c=bellaso: c.encrypt(text)))
+        cases.append(("bellaso", key_length, "table", "decrypt", lambda c=bellaso: c.decrypt(text)))
+        if len(text) <= LOOP_MAX_SIZE:
+            cases.append(("bellaso", key_length, "loop", "encrypt", lambda c=bellaso: c._encrypt(text, c.key)))
+        if text.isascii():
+            data: bytes = text.encode("ascii")
+            cases.append(("bellaso", key_length, "bytes", "encrypt", lambda c=bellaso: c.encrypt_bytes(data)))
+    return cases
+
+
+def run(sizes: tuple[int, ...], key_lengths: tuple[int, ...], repeat: int) -> list[Record]:
+    records: list[Record] = []
+    for alphabet_name, alphabet in ALPHABETS.items():
+        for size in sizes:
+            text: str = make_text(size, alphabet)
+            for cipher, key_length, engine, operation, call in cipher_cases(text, key_lengths):
+                seconds: float = bench(call, repeat)
+                records.append({
+                    "cipher": cipher,
+                    "engine": engine,
+                    "operation": operation,
+                    "alphabet": alphabet_name,
+                    "size": size,
+                    "key_length": key_length,
+                    "seconds": seconds,
+                    "chars_per_sec": size / seconds if seconds else float("inf"),
+                })
+
+    if np is not None:
+        import crack
+
+        english: str = make_english(max(sizes))
+        ceasar_text: str = CeasarCipher(shift=3).encrypt(english)
+        bellaso_text: str = BellasoCipher(key="KEYWORD").encrypt(english)
+        for cipher, call in (
+            ("ceasar", lambda: crack.crack_ceasar(ceasar_text)),
+            ("bellaso", lambda: crack.crack_bellaso(bellaso_text)),
+        ):
+            seconds = bench(call, repeat)
+            records.append({
+                "cipher": cipher,
+                "engine": "numpy",
+                "operation": "crack",
+                "alphabet": "english",
+                "size": len(english),
+                "key_length": 7 if cipher == "bellaso" else None,
+                "seconds": seconds,
+                "chars_per_sec": len(english) / seconds,
+            })
+    return records
+
+
+def record_id(record: Record) -> tuple[object, ...]:
+    return tuple(record[field] for field in ("cipher", "engine", "operation", "alphabet", "size", "key_length"))
+
+
+def find_regressions(records: list[Record], baseline: list[Record], tolerance: float) -> list[str]:
+    previous: dict[tuple[object, ...], Record] = {record_id(record): record for record in baseline}
+    regressions: list[str] = []
+    for record in records:
+        old: Record | None = previous.get(record_id(record))
+        if old and record["chars_per_sec"] < old["chars_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{'/'.join(str(part) for part in record_id(record))}: "
+                f"{old['chars_per_sec']:,.0f} -> {record['chars_per_sec']:,.0f} chars/sec"
+            )
+    return regressions
+
+
+def print_records(records: list[Record]) -> None:
+    print(f"{'cipher':<8} {'engine':<6} {'op':<8} {'alphabet':<8} {'size':>10} {'key':>4} {'chars/sec':>16}")
+    for record in records:
+        key_length: str = str(record["key_length"]) if record["key_length"] is not None else "-"
+        print(
+            f"{record['cipher']:<8} {record['engine']:<6} {record['operation']:<8} {record['alphabet']:<8} "
+            f"{record['size']:>10,} {key_length:>4} {record['chars_per_sec']:>16,.0f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the data_encryption ciphers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--key-lengths", type=int, nargs="+", default=list(DEFAULT_KEY_LENGTHS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    records: list[Record] = run(tuple(args.sizes), tuple(args.key_lengths), args.repeat)
+    print_records(records)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": getattr(np, "__version__", None),
+                "results": records,
+            }, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions: list[str] = find_regressions(records, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,52 @@
+import string
+from functools import cached_property, partial
+from typing import BinaryIO
+
+from parallel import DEFAULT_SHARD_SIZE, transform_parallel
+from stream import DEFAULT_CHUNK_SIZE, transform_stream
+
+BytesLike = bytes | bytearray | memoryview
+
+
 class CeasarCipher:
     def __init__(self, shift: int) -> None:
         self.shift = shift % 26  # Ensure the shift is within 0-25
 
+    @staticmethod
+    def _build_table(key: int) -> dict[int, int]:
+        # Map every ASCII letter to its shifted counterpart, so a whole text
+        # can be handled by a single `str.translate` call.
+        shifted_lower: str = "".join(
+            chr((ord(char) - ord('a') + key) % 26 + ord('a')) for char in string.ascii_lowercase
+        )
+        shifted_upper: str = shifted_lower.upper()
+        return str.maketrans(
+            string.ascii_lowercase + string.ascii_uppercase,
+            shifted_lower + shifted_upper,
+        )
+
+    @staticmethod
+    def _build_bytes_table(key: int) -> bytes:
+        # The same mapping as `_build_table`, as a 256-byte table for bytes input.
+        table: dict[int, int] = CeasarCipher._build_table(key)
+        return bytes(table.get(byte, byte) for byte in range(256))
+
+    @cached_property
+    def _encrypt_table(self) -> dict[int, int]:
+        return self._build_table(self.shift)
+
+    @cached_property
+    def _decrypt_table(self) -> dict[int, int]:
+        return self._build_table(-self.shift)
+
+    @cached_property
+    def _encrypt_bytes_table(self) -> bytes:
+        return self._build_bytes_table(self.shift)
+
+    @cached_property
+    def _decrypt_bytes_table(self) -> bytes:
+        return self._build_bytes_table(-self.shift)
+
     def _encrypt(self, plain_text: str, key: int):
         encrypted_text: list[str] = []
         for char in plain_text:
@@ -17,11 +62,66 @@ class CeasarCipher:
         reversed_key: int = -key
         return self._encrypt(plain_text, reversed_key)
 
-    def encrypt(self, plain_text: str) -> str:
-        return self._encrypt(plain_text, self.shift)
+    def _transform(self, text: str, offset: int = 0, decrypt: bool = False) -> str:
+        # A Caesar shift does not depend on the character position; `offset`
+        # is accepted so both ciphers share the same chunked interface.
+        # The tables only cover ASCII letters; other letters (e.g. "é") still
+        # go through the character loop so the output stays identical.
+        if text.isascii():
+            return text.translate(self._decrypt_table if decrypt else self._encrypt_table)
+        if decrypt:
+            return self._decrypt(text, self.shift)
+        return self._encrypt(text, self.shift)
+
+    def _transform_into(self, buffer: BytesLike, decrypt: bool = False) -> None:
+        table: bytes = self._decrypt_bytes_table if decrypt else self._encrypt_bytes_table
+        if isinstance(buffer, bytearray):
+            # Translate straight from the bytearray: one copy instead of two.
+            buffer[:] = buffer.translate(table)
+            return
+        view: memoryview = memoryview(buffer).cast("B")
+        if view.readonly:
+            raise TypeError("buffer must be writable, e.g. a bytearray")
+        view[:] = view.tobytes().translate(table)
+
+    def encrypt(self, plain_text: str | BytesLike) -> str | bytes:
+        # Bytes-like input is handled as raw bytes: only ASCII letters shift.
+        if isinstance(plain_text, str):
+            return self._transform(plain_text)
+        return bytes(plain_text).translate(self._encrypt_bytes_table)
+
+    def decrypt(self, ciphertext: str | BytesLike) -> str | bytes:
+        if isinstance(ciphertext, str):
+            return self._transform(ciphertext, decrypt=True)
+        return bytes(ciphertext).translate(self._decrypt_bytes_table)
+
+    def encrypt_into(self, buffer: BytesLike) -> None:
+        """Encrypt a writable buffer (bytearray, writable memoryview) in place."""
+        self._transform_into(buffer)
+
+    def decrypt_into(self, buffer: BytesLike) -> None:
+        """Decrypt a writable buffer (bytearray, writable memoryview) in place."""
+        self._transform_into(buffer, decrypt=True)
+
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Encrypt UTF-8 bytes from `src` into `dst`, one chunk at a time."""
+        return transform_stream(src, dst, self._transform, chunk_size=chunk_size)
+
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Decrypt UTF-8 bytes from `src` into `dst`, one chunk at a time."""
+        return transform_stream(src, dst, partial(self._transform, decrypt=True), chunk_size=chunk_size)
+
+    def encrypt_parallel(
+        self, plain_text: str, workers: int | None = None, shard_size: int = DEFAULT_SHARD_SIZE
+    ) -> str:
+        """Encrypt shards of `plain_text` in a process pool; same result as `encrypt`."""
+        return transform_parallel(self, plain_text, workers=workers, shard_size=shard_size)
 
-    def decrypt(self, ciphertext: str) -> str:
-        return self._decrypt(ciphertext, self.shift)
+    def decrypt_parallel(
+        self, cipher_text: str, workers: int | None = None, shard_size: int = DEFAULT_SHARD_SIZE
+    ) -> str:
+        """Decrypt shards of `cipher_text` in a process pool; same result as `decrypt`."""
+        return transform_parallel(self, cipher_text, decrypt=True, workers=workers, shard_size=shard_size)
 
 
 def main() -> None:
@@ -0,0 +1,55 @@
+import argparse
+import sys
+from typing import BinaryIO
+
+from bellaso_cipher import BellasoCipher
+from ceasar_cipher import CeasarCipher
+from stream import DEFAULT_CHUNK_SIZE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt UTF-8 files in chunks.")
+    parser.add_argument("action", choices=["encrypt", "decrypt"])
+    ciphers = parser.add_subparsers(dest="cipher", required=True)
+
+    ceasar = ciphers.add_parser("ceasar", help="Caesar shift cipher")
+    ceasar.add_argument("--shift", type=int, required=True)
+
+    bellaso = ciphers.add_parser("bellaso", help="Bellaso (Vigenère) cipher")
+    bellaso.add_argument("--key", required=True)
+
+    for sub in (ceasar, bellaso):
+        sub.add_argument("input", nargs="?", default="-", help="input file, '-' for stdin")
+        sub.add_argument("output", nargs="?", default="-", help="output file, '-' for stdout")
+        sub.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    return parser
+
+
+def open_binary(path: str, mode: str) -> BinaryIO:
+    if path == "-":
+        return sys.stdin.buffer if "r" in mode else sys.stdout.buffer
+    return open(path, mode)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    cipher: CeasarCipher | BellasoCipher = (
+        CeasarCipher(shift=args.shift) if args.cipher == "ceasar" else BellasoCipher(key=args.key)
+    )
+
+    src: BinaryIO = open_binary(args.input, "rb")
+    dst: BinaryIO = open_binary(args.output, "wb")
+    try:
+        if args.action == "encrypt":
+            cipher.encrypt_stream(src, dst, chunk_size=args.chunk_size)
+        else:
+            cipher.decrypt_stream(src, dst, chunk_size=args.chunk_size)
+        dst.flush()
+    finally:
+        for stream in (src, dst):
+            if stream not in (sys.stdin.buffer, sys.stdout.buffer):
+                stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Relative letter frequencies of English text, "a" to "z".
+ENGLISH_FREQUENCIES = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+
+# Number of letters scored per candidate key length.
+KEY_LENGTH_SAMPLE: int = 1 << 16
+
+
+def _letters(cipher_text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return the 0-25 values of the ASCII letters and their character indices."""
+    if cipher_text.isascii():
+        codes = np.frombuffer(cipher_text.encode("ascii"), dtype=np.uint8)
+    else:
+        # One code point per character keeps indices equal to `str` indices,
+        # which is what the Bellaso key position is based on.
+        codes = np.frombuffer(cipher_text.encode("utf-32-le"), dtype=np.uint32)
+    folded = codes | 0x20
+    is_letter = (folded >= ord("a")) & (folded <= ord("z"))
+    positions = np.flatnonzero(is_letter)
+    return (folded[positions] - ord("a")).astype(np.intp), positions
+
+
+def _best_shifts(counts: np.ndarray) -> np.ndarray:
+    """Pick, for each row of letter counts, the shift with the lowest chi-squared."""
+    counts = np.atleast_2d(counts).astype(float)
+    totals = counts.sum(axis=1, keepdims=True)
+    # shifted[row, s, c] = number of letters that decrypt to `c` with shift `s`.
+    indices = (np.arange(26)[:, None] + np.arange(26)[None, :]) % 26
+    shifted = counts[:, indices]
+    expected = np.maximum(totals[:, :, None] * ENGLISH_FREQUENCIES, 1e-12)
+    chi_squared = ((shifted - expected) ** 2 / expected).sum(axis=2)
+    return chi_squared.argmin(axis=1)
+
+
+def crack_ceasar(cipher_text: str) -> int:
+    """Return the most likely shift that was used to encrypt `cipher_text`."""
+    letters, _ = _letters(cipher_text)
+    if letters.size == 0:
+        raise ValueError("cipher_text has no letters to analyse")
+    return int(_best_shifts(np.bincount(letters, minlength=26))[0])
+
+
+def _column_counts(letters: np.ndarray, positions: np.ndarray, key_length: int) -> np.ndarray:
+    columns = positions % key_length
+    return np.bincount(columns * 26 + letters, minlength=key_length * 26).reshape(key_length, 26)
+
+
+def _estimate_key_length(letters: np.ndarray, positions: np.ndarray, max_key_length: int) -> int:
+    # The index of coincidence compares pairs of letters, so one is not enough.
+    if letters.size < 2:
+        raise ValueError("cipher_text has too few letters to analyse")
+    # The index of coincidence settles long before megabytes of text, so only
+    # a prefix is scored for every candidate length.
+    letters, positions = letters[:KEY_LENGTH_SAMPLE], positions[:KEY_LENGTH_SAMPLE]
+
+    scores: list[float] = []
+    for key_length in range(1, max_key_length + 1):
+        counts = _column_counts(letters, positions, key_length)
+        sizes = counts.sum(axis=1)
+        valid = sizes > 1
+        if not valid.any():
+            break
+        coincidences = (counts * (counts - 1)).sum(axis=1)[valid] / (sizes[valid] * (sizes[valid] - 1))
+        scores.append(float(coincidences.mean()))
+
+    # Multiples of the real length score just as well, so take the shortest
+    # length that gets close to the best score instead of the maximum.
+    threshold: float = 0.9 * max(scores)
+    return next(length for length, score in enumerate(scores, start=1) if score >= threshold)
+
+
+def estimate_key_length(cipher_text: str, max_key_length: int = 20) -> int:
+    """Estimate the Bellaso key length with the index of coincidence."""
+    return _estimate_key_length(*_letters(cipher_text), max_key_length)
+
+
+def crack_bellaso(cipher_text: str, max_key_length: int = 20) -> str:
+    """Return the most likely key that was used to encrypt `cipher_text`."""
+    letters, positions = _letters(cipher_text)
+    key_length: int = _estimate_key_length(letters, positions, max_key_length)
+    shifts = _best_shifts(_column_counts(letters, positions, key_length))
+    return "".join(chr(ord("A") + int(shift)) for shift in shifts)
@@ -0,0 +1,45 @@
+from functools import lru_cache
+
+from bellaso_cipher import BellasoCipher
+from ceasar_cipher import CeasarCipher
+
+CIPHER_CACHE_SIZE: int = 256
+
+
+# Cached instances are shared between callers, so they must be treated as
+# read-only: changing `shift`/`key` would not refresh their cached tables.
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def _ceasar_cipher(shift: int) -> CeasarCipher:
+    cipher: CeasarCipher = CeasarCipher(shift=shift)
+    # Build both tables now so later calls only pay for applying them.
+    cipher._encrypt_table, cipher._decrypt_table
+    return cipher
+
+
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def _bellaso_cipher(key: str) -> BellasoCipher:
+    cipher: BellasoCipher = BellasoCipher(key=key)
+    cipher._encrypt_tables, cipher._decrypt_tables
+    return cipher
+
+
+def get_ceasar_cipher(shift: int) -> CeasarCipher:
+    # Equivalent shifts (3, 29, -23) share one instance.
+    return _ceasar_cipher(shift % 26)
+
+
+def get_bellaso_cipher(key: str) -> BellasoCipher:
+    return _bellaso_cipher(key)
+
+
+def cache_info() -> dict[str, tuple[int, int, int | None, int]]:
+    """`functools` CacheInfo (hits, misses, maxsize, currsize) per cipher type."""
+    return {
+        "ceasar": _ceasar_cipher.cache_info(),
+        "bellaso": _bellaso_cipher.cache_info(),
+    }
+
+
+def cache_clear() -> None:
+    _ceasar_cipher.cache_clear()
+    _bellaso_cipher.cache_clear()
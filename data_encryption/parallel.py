@@ -0,0 +1,34 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Protocol
+
+DEFAULT_SHARD_SIZE: int = 1 << 22
+
+
+class ShardCipher(Protocol):
+    def _transform(self, text: str, offset: int = 0, decrypt: bool = False) -> str: ...
+
+
+def _transform_shard(cipher: ShardCipher, shard: str, offset: int, decrypt: bool) -> str:
+    return cipher._transform(shard, offset=offset, decrypt=decrypt)
+
+
+def transform_parallel(
+    cipher: ShardCipher,
+    text: str,
+    decrypt: bool = False,
+    workers: int | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> str:
+    if shard_size <= 0:
+        raise ValueError("shard_size must be positive")
+    if len(text) <= shard_size:
+        return cipher._transform(text, decrypt=decrypt)
+
+    # Each shard gets its start index as offset, so a worker resumes the key
+    # exactly where the previous shard stopped (`start % len(key)`).
+    starts: range = range(0, len(text), shard_size)
+    shards = (text[start:start + shard_size] for start in starts)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # `map` yields results in submission order, so joining keeps the text in order.
+        return "".join(pool.map(_transform_shard, repeat(cipher), shards, starts, repeat(decrypt)))
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import factory
+from bellaso_cipher import BellasoCipher
+from ceasar_cipher import CeasarCipher
+
+# Messages up to this many characters are cheaper to encrypt than to hand off.
+INLINE_MAX_SIZE: int = 16 * 1024
+MAX_PENDING: int = 1024
+MAX_BATCH_SIZE: int = 256
+LATENCY_WINDOW: int = 10_000
+
+Payload = str | bytes
+
+
+def _get_cipher(kind: str, key: int | str) -> CeasarCipher | BellasoCipher:
+    if kind == "ceasar":
+        return factory.get_ceasar_cipher(int(key))
+    if kind == "bellaso":
+        return factory.get_bellaso_cipher(str(key))
+    raise ValueError(f"Unknown cipher '{kind}'.")
+
+
+def _run_batch(kind: str, key: int | str, decrypt: bool, payloads: list[Payload]) -> list[Payload]:
+    # Module-level so it can also be sent to a ProcessPoolExecutor.
+    cipher: CeasarCipher | BellasoCipher = _get_cipher(kind, key)
+    transform = cipher.decrypt if decrypt else cipher.encrypt
+    return [transform(payload) for payload in payloads]
+
+
+@dataclass
+class _Request:
+    kind: str
+    key: int | str
+    decrypt: bool
+    payload: Payload
+    future: asyncio.Future
+    started: float
+
+
+def _fail(requests: list[_Request], error: BaseException) -> None:
+    for request in requests:
+        if not request.future.done():
+            request.future.set_exception(error)
+
+
+class CipherService:
+    """Async facade over the ciphers.
+
+    Small messages are handled inline on the event loop. Large ones go through
+    a bounded queue: `encrypt`/`decrypt` wait while it is full, and requests
+    queued for the same cipher and key are sent to the executor as one batch.
+    The default executor is a thread pool; pass a ProcessPoolExecutor to use
+    several cores.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        inline_max_size: int = INLINE_MAX_SIZE,
+        max_pending: int = MAX_PENDING,
+        workers: int = 4,
+    ) -> None:
+        self._executor: Executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self._owns_executor: bool = executor is None
+        self.inline_max_size = inline_max_size
+        self._workers: int = workers
+        self._queue: asyncio.Queue[_Request] = asyncio.Queue(maxsize=max_pending)
+        self._tasks: list[asyncio.Task] = []
+        self._closed: bool = False
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.stats: dict[str, int] = {"inline": 0, "offloaded": 0, "batches": 0}
+
+    async def __aenter__(self) -> "CipherService":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def close(self) -> None:
+        """Stop the workers; queued and in-flight requests fail with RuntimeError."""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._fail_queued()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    async def encrypt(self, kind: str, key: int | str, payload: Payload) -> Payload:
+        return await self._submit(kind, key, False, payload)
+
+    async def decrypt(self, kind: str, key: int | str, payload: Payload) -> Payload:
+        return await self._submit(kind, key, True, payload)
+
+    async def _submit(self, kind: str, key: int | str, decrypt: bool, payload: Payload) -> Payload:
+        if self._closed:
+            raise RuntimeError("service closed")
+        started: float = time.perf_counter()
+        if len(payload) <= self.inline_max_size:
+            self.stats["inline"] += 1
+            result: Payload = _run_batch(kind, key, decrypt, [payload])[0]
+            self._latencies.append(time.perf_counter() - started)
+            return result
+
+        self.start()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(kind, key, decrypt, payload, future, started))
+        if self._closed:
+            # The put was waiting for room while close() drained the queue.
+            self._fail_queued()
+        return await future
+
+    def _fail_queued(self) -> None:
+        while not self._queue.empty():
+            _fail([self._queue.get_nowait()], RuntimeError("service closed"))
+            self._queue.task_done()
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            requests: list[_Request] = [await self._queue.get()]
+            try:
+                await self._process(loop, requests)
+            except asyncio.CancelledError:
+                _fail(requests, RuntimeError("service closed"))
+                raise
+            finally:
+                for _ in requests:
+                    self._queue.task_done()
+
+    async def _process(self, loop: asyncio.AbstractEventLoop, requests: list[_Request]) -> None:
+        while len(requests) < MAX_BATCH_SIZE and not self._queue.empty():
+            requests.append(self._queue.get_nowait())
+
+        batches: dict[tuple[str, int | str, bool], list[_Request]] = {}
+        for request in requests:
+            batches.setdefault((request.kind, request.key, request.decrypt), []).append(request)
+
+        for (kind, key, decrypt), batch in batches.items():
+            self.stats["batches"] += 1
+            self.stats["offloaded"] += len(batch)
+            payloads: list[Payload] = [request.payload for request in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, _run_batch, kind, key, decrypt, payloads)
+            except Exception as error:
+                _fail(batch, error)
+                continue
+            finished: float = time.perf_counter()
+            for request, result in zip(batch, results):
+                self._latencies.append(finished - request.started)
+                if not request.future.done():
+                    request.future.set_result(result)
+
+    def latency(self) -> dict[str, float]:
+        """p50/p99 latency in seconds over the most recent requests."""
+        if not self._latencies:
+            return {"count": 0, "p50": 0.0, "p99": 0.0}
+        ordered: list[float] = sorted(self._latencies)
+        last: int = len(ordered) - 1
+        return {
+            "count": len(ordered),
+            "p50": ordered[round(0.50 * last)],
+            "p99": ordered[round(0.99 * last)],
+        }
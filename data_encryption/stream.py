@@ -0,0 +1,31 @@
+import codecs
+from typing import BinaryIO, Callable
+
+DEFAULT_CHUNK_SIZE: int = 1 << 20
+
+# Called as transform(text, offset) where `offset` is the index of `text[0]`
+# in the whole stream, so position-dependent ciphers can resume their key.
+ChunkTransform = Callable[[str, int], str]
+
+
+def transform_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    transform: ChunkTransform,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    # The incremental decoder holds back a multi-byte UTF-8 sequence that is
+    # split across two reads until the rest of it arrives.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    offset: int = 0
+    while True:
+        chunk: bytes = src.read(chunk_size)
+        text: str = decoder.decode(chunk, final=not chunk)
+        if text:
+            dst.write(transform(text, offset).encode("utf-8"))
+            offset += len(text)
+        if not chunk:
+            return offset
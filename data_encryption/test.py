@@ -1,5 +1,41 @@
+import asyncio
+import io
+import random
+import string
+from concurrent.futures import Executor, Future
+
+import pytest
+
 from bellaso_cipher import BellasoCipher
 from ceasar_cipher import CeasarCipher
+import factory
+from service import CipherService
+
+# Property tests draw their inputs from a seeded generator, so every faster
+# engine is checked against the reference `_encrypt` loop on many inputs.
+PROPERTY_EXAMPLES: int = 200
+PROPERTY_ALPHABET: str = string.ascii_letters + string.digits + string.punctuation + " \n" + "éÜßÇ日本"
+
+
+def random_text(rng: random.Random, alphabet: str = PROPERTY_ALPHABET, max_size: int = 300) -> str:
+    return "".join(rng.choices(alphabet, k=rng.randint(0, max_size)))
+
+
+def random_ciphers(rng: random.Random, key_alphabet: str) -> list[CeasarCipher | BellasoCipher]:
+    key: str = "".join(rng.choices(key_alphabet, k=rng.randint(1, 12)))
+    return [CeasarCipher(shift=rng.randint(-100, 100)), BellasoCipher(key=key)]
+
+
+def reference_encrypt(cipher: CeasarCipher | BellasoCipher, text: str) -> str:
+    if isinstance(cipher, CeasarCipher):
+        return cipher._encrypt(text, cipher.shift)
+    return cipher._encrypt(text, cipher.key)
+
+
+def reference_decrypt(cipher: CeasarCipher | BellasoCipher, text: str) -> str:
+    if isinstance(cipher, CeasarCipher):
+        return cipher._decrypt(text, cipher.shift)
+    return cipher._encrypt(text, cipher._reversed_key)
 
 def test_bellaso_cipher() -> None:
     key: str = "KEYWORD"
@@ -20,7 +56,173 @@ def test_ceasar_cipher() -> None:
     assert encrypted == "Khoor, Zruog!"
     assert decrypted == plaintext
 
+def test_table_engine_matches_loop() -> None:
+    texts: list[str] = ["Hello, World!", "The quick brown fox 123 ~{}", "Ça va, Zoë?", ""]
+    for shift in (0, 3, 25, -7):
+        ceasar: CeasarCipher = CeasarCipher(shift=shift)
+        for text in texts:
+            assert ceasar.encrypt(text) == ceasar._encrypt(text, ceasar.shift)
+            assert ceasar.decrypt(text) == ceasar._decrypt(text, ceasar.shift)
+    for key in ("KEYWORD", "a", "Zz9!", "lemon"):
+        bellaso: BellasoCipher = BellasoCipher(key=key)
+        for text in texts:
+            assert bellaso.encrypt(text) == bellaso._encrypt(text, key)
+            assert bellaso.decrypt(text) == bellaso._encrypt(text, bellaso._reversed_key)
+
+def test_bellaso_bytes_matches_str() -> None:
+    text: str = "Hello, World! 0123 The quick brown fox jumps over the lazy dog. " * 50
+    for key in ("KEYWORD", "a", "Zz9!"):
+        cipher: BellasoCipher = BellasoCipher(key=key)
+        encrypted: bytes = cipher.encrypt_bytes(text.encode("ascii"))
+        assert encrypted == cipher.encrypt(text).encode("ascii")
+        assert cipher.decrypt_bytes(encrypted) == cipher.decrypt(cipher.encrypt(text)).encode("ascii")
+
+def test_stream_matches_whole_string() -> None:
+    text: str = "Héllo, Wörld! 日本語 The quick brown fox. " * 40
+    data: bytes = text.encode("utf-8")
+    ciphers: list[CeasarCipher | BellasoCipher] = [CeasarCipher(shift=3), BellasoCipher(key="KEYWORD")]
+    for cipher in ciphers:
+        for chunk_size in (1, 2, 7, 64, len(data) + 1):
+            encrypted = io.BytesIO()
+            assert cipher.encrypt_stream(io.BytesIO(data), encrypted, chunk_size=chunk_size) == len(text)
+            assert encrypted.getvalue() == cipher.encrypt(text).encode("utf-8")
+
+            decrypted = io.BytesIO()
+            cipher.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, chunk_size=chunk_size)
+            assert decrypted.getvalue() == cipher.decrypt(cipher.encrypt(text)).encode("utf-8")
+
+def test_parallel_matches_serial() -> None:
+    text: str = "Hello, World! Ça va? The quick brown fox. " * 100
+    ciphers: list[CeasarCipher | BellasoCipher] = [CeasarCipher(shift=3), BellasoCipher(key="KEYWORD")]
+    for cipher in ciphers:
+        encrypted: str = cipher.encrypt_parallel(text, workers=2, shard_size=333)
+        assert encrypted == cipher.encrypt(text)
+        assert cipher.decrypt_parallel(encrypted, workers=2, shard_size=333) == cipher.decrypt(encrypted)
+
+def test_factory_reuses_instances() -> None:
+    factory.cache_clear()
+    assert factory.get_ceasar_cipher(3) is factory.get_ceasar_cipher(29)
+    assert factory.get_bellaso_cipher("KEYWORD") is factory.get_bellaso_cipher("KEYWORD")
+    assert factory.get_bellaso_cipher("KEYWORD").decrypt("Rijhc, Gsphr!") == "Hello, World!"
+
+    info = factory.cache_info()
+    assert (info["ceasar"].hits, info["ceasar"].misses) == (1, 1)
+    assert (info["bellaso"].hits, info["bellaso"].misses) == (2, 1)
+
+def test_crack_recovers_keys() -> None:
+    pytest.importorskip("numpy")
+    import crack
+
+    plaintext: str = (
+        "It was the best of times, it was the worst of times, it was the age of wisdom, "
+        "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+        "incredulity, it was the season of Light, it was the season of Darkness, it was "
+        "the spring of hope, it was the winter of despair, we had everything before us, "
+        "we had nothing before us, we were all going direct to Heaven, we were all going "
+        "direct the other way."
+    )
+    assert crack.crack_ceasar(CeasarCipher(shift=11).encrypt(plaintext)) == 11
+    assert crack.crack_bellaso(BellasoCipher(key="LEMON").encrypt(plaintext)) == "LEMON"
+    for too_short in ("", "A", "1 A 2"):
+        with pytest.raises(ValueError):
+            crack.crack_bellaso(too_short)
+
+def test_property_engines_match_reference() -> None:
+    rng: random.Random = random.Random(1234)
+    for _ in range(PROPERTY_EXAMPLES):
+        text: str = random_text(rng)
+        for cipher in random_ciphers(rng, string.ascii_letters + string.digits + "!?"):
+            encrypted: str = reference_encrypt(cipher, text)
+            assert cipher.encrypt(text) == encrypted
+            assert cipher.decrypt(text) == reference_decrypt(cipher, text)
+
+            streamed = io.BytesIO()
+            cipher.encrypt_stream(io.BytesIO(text.encode("utf-8")), streamed, chunk_size=rng.randint(1, 64))
+            assert streamed.getvalue() == encrypted.encode("utf-8")
+
+def test_property_round_trip() -> None:
+    rng: random.Random = random.Random(5678)
+    ascii_alphabet: str = string.ascii_letters + string.digits + string.punctuation + " \n"
+    for _ in range(PROPERTY_EXAMPLES):
+        text: str = random_text(rng, ascii_alphabet)
+        for cipher in random_ciphers(rng, string.ascii_letters):
+            assert cipher.decrypt(cipher.encrypt(text)) == text
+
+def test_property_bytes_engine_matches_reference() -> None:
+    rng: random.Random = random.Random(91011)
+    ascii_alphabet: str = string.ascii_letters + string.digits + string.punctuation + " \n"
+    for _ in range(PROPERTY_EXAMPLES):
+        text: str = random_text(rng, ascii_alphabet)
+        cipher: BellasoCipher = random_ciphers(rng, string.ascii_letters)[1]
+        assert cipher.encrypt_bytes(text.encode("ascii")) == reference_encrypt(cipher, text).encode("ascii")
+
+def test_bytes_api_matches_str() -> None:
+    text: str = "Hello, World! The quick brown fox 123."
+    ciphers: list[CeasarCipher | BellasoCipher] = [CeasarCipher(shift=3), BellasoCipher(key="KEYWORD")]
+    for cipher in ciphers:
+        expected: bytes = cipher.encrypt(text).encode("ascii")
+        data: bytes = text.encode("ascii")
+        assert cipher.encrypt(data) == expected
+        assert cipher.encrypt(bytearray(data)) == expected
+        assert cipher.encrypt(memoryview(data)) == expected
+        assert cipher.decrypt(expected) == data
+
+        buffer: bytearray = bytearray(data)
+        cipher.encrypt_into(memoryview(buffer))
+        assert buffer == expected
+        cipher.decrypt_into(buffer)
+        assert buffer == data
+
+        with pytest.raises(TypeError):
+            cipher.encrypt_into(data)
+
+def test_cipher_service() -> None:
+    async def scenario() -> CipherService:
+        async with CipherService(inline_max_size=16, workers=1) as service:
+            assert await service.encrypt("ceasar", 3, "Hello, World!") == "Khoor, Zruog!"
+            texts: list[str] = [f"Hello, World! message {i}" for i in range(20)]
+            encrypted = await asyncio.gather(*(service.encrypt("bellaso", "KEYWORD", text) for text in texts))
+            assert encrypted == [BellasoCipher(key="KEYWORD").encrypt(text) for text in texts]
+            assert await service.decrypt("bellaso", "KEYWORD", encrypted[0]) == texts[0]
+        return service
+
+    service: CipherService = asyncio.run(scenario())
+    assert service.stats["inline"] == 1
+    assert service.stats["offloaded"] == 21
+    assert service.stats["batches"] < 21  # concurrent requests for one key were coalesced
+    assert service.latency()["count"] == 22
+
+
+def test_cipher_service_close_fails_pending() -> None:
+    class StalledExecutor(Executor):
+        def submit(self, fn, /, *args, **kwargs) -> Future:
+            return Future()  # never finishes, so the batch stays in flight
+
+    async def scenario() -> None:
+        service = CipherService(StalledExecutor(), inline_max_size=0, max_pending=2, workers=1)
+        pending = [asyncio.create_task(service.encrypt("ceasar", 3, "Hello")) for _ in range(5)]
+        await asyncio.sleep(0.01)  # one batch in flight, the queue full, the rest waiting for room
+        await service.close()
+        results = await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), timeout=5)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError, match="service closed"):
+            await service.encrypt("ceasar", 3, "Hello")
+
+    asyncio.run(scenario())
+
 if __name__ == "__main__":
     test_bellaso_cipher()
     test_ceasar_cipher()
+    test_table_engine_matches_loop()
+    test_bellaso_bytes_matches_str()
+    test_stream_matches_whole_string()
+    test_parallel_matches_serial()
+    test_factory_reuses_instances()
+    test_crack_recovers_keys()
+    test_property_engines_match_reference()
+    test_property_round_trip()
+    test_property_bytes_engine_matches_reference()
+    test_bytes_api_matches_str()
+    test_cipher_service()
+    test_cipher_service_close_fails_pending()
     # print("All tests passed.")